@@ -0,0 +1,330 @@
+"""
+Offline end-to-end throughput benchmark.
+
+Runs process_batch, generate_rivalry_matches and generate_highlight_reel
+over synthetic careers (1k-100k rows) against the deterministic
+MockBackend, and reports rows/sec, p50/p95 per-row latency, LLM calls per
+row and peak RSS. Results can be saved and compared against a baseline to
+catch performance regressions:
+
+    python benchmark.py --rows 1000 10000 --save bench.json
+    python benchmark.py --rows 1000 10000 --baseline bench.json
+
+--startup instead measures cold start - import, engine construction and
+a first player lookup in a fresh interpreter - against a time budget:
+
+    python benchmark.py --startup --rows 10000 --startup-budget 1500
+"""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from engine_logging import configure_logging
+from llm_backends import MockBackend
+from llm_client import LLMClient
+from rate_limiter import RateLimiter
+from reaction_engine import ReactionEngine
+
+SCENARIOS = {
+    'batch': lambda engine, personalities: engine.process_batch(include_personalities=personalities),
+    'rivalry': lambda engine, personalities: engine.generate_rivalry_matches(include_personalities=personalities),
+    'highlights': lambda engine, personalities: engine.generate_highlight_reel(include_personalities=personalities)
+}
+
+# Runs in a fresh interpreter: argv = source dir, CSV dir, player name
+STARTUP_SCRIPT = """
+import json, os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import config
+for attr, name in (('BIGMATCHUPS_CSV', 'bigmatchups.csv'), ('SEASONSTATS_CSV', 'seasonstats.csv'),
+                   ('PLAYERMATCH_CSV', 'playermatchratinghistory.csv')):
+    setattr(config, attr, os.path.join(sys.argv[2], name))
+from engine_logging import configure_logging
+configure_logging(stream=open(os.devnull, 'w'))
+from reaction_engine import ReactionEngine
+imported = time.perf_counter()
+engine = ReactionEngine()
+built = time.perf_counter()
+matches = engine.player_index.rows_for(sys.argv[3])
+looked_up = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'init_ms': (built - imported) * 1000,
+    'lookup_ms': (looked_up - built) * 1000,
+    'total_ms': (looked_up - start) * 1000,
+    'matches': len(matches),
+    'sdk_imported': 'groq' in sys.modules
+}))
+"""
+
+def synthetic_career(rows, teams=20, squad_size=25, rivalries=12, seed=0):
+    """
+    Build (df_big, df_season, df_player) shaped like the career exports
+    
+    Returns:
+        tuple of DataFrames
+    """
+    rng = np.random.default_rng(seed)
+    team_names = np.array([f"Team {i}" for i in range(1, teams + 1)])
+    
+    # Each player belongs to one team
+    num_players = teams * squad_size
+    player_team = np.arange(num_players) // squad_size
+    player_names = np.array([f"Player {i:04d}" for i in range(num_players)])
+    
+    player = rng.integers(0, num_players, rows)
+    team = player_team[player]
+    opponent = (team + rng.integers(1, teams, rows)) % teams
+    rating = np.clip(rng.normal(6.8, 0.9, rows), 3.0, 10.0).round(1)
+    dates = pd.Timestamp('2014-08-16') + pd.to_timedelta(np.arange(rows) // (teams * 11) * 7, unit='D')
+    
+    df_player = pd.DataFrame({
+        'playername': player_names[player],
+        'playerid': 100000 + player,
+        'team': team_names[team],
+        'teamid': team + 1,
+        'opponent': team_names[opponent],
+        'opponentid': opponent + 1,
+        'goals': np.minimum(rng.poisson(0.35, rows), 4),
+        'rating': rating,
+        'minsplayed': rng.choice([90, 90, 90, 75, 60, 25, 15], rows),
+        'MOTM': np.where((rating >= 8.5) & (rng.random(rows) < 0.5), 'Yes', 'No'),
+        'artificialkey': np.arange(rows),
+        'date': dates.strftime('%Y%m%d').astype(int)
+    })
+    
+    wins = rng.integers(0, 30, teams)
+    draws = rng.integers(0, 10, teams)
+    df_season = pd.DataFrame({
+        'team': team_names,
+        'points': wins * 3 + draws,
+        'wins': wins,
+        'draws': draws,
+        'losses': 38 - wins - draws,
+        'goals_for': rng.integers(20, 90, teams),
+        'goals_against': rng.integers(20, 90, teams)
+    })
+    
+    pairs = rng.choice(teams, size=(rivalries, 2), replace=True)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]] + 1
+    df_big = pd.DataFrame({'teamid1': pairs[:, 0], 'teamid2': pairs[:, 1]})
+    
+    return df_big, df_season, df_player
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 2**20
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024  # bytes on macOS, KB elsewhere
+
+
+class RowClock:
+    """Output sink that timestamps every recorded reaction"""
+    
+    path = None
+    
+    def __init__(self):
+        self.times = []
+    
+    def write(self, entry):
+        self.times.append(time.perf_counter())
+    
+    def close(self):
+        pass
+
+
+def run_case(scenario, rows, options):
+    """Run one scenario on a fresh synthetic career and engine; returns its metrics"""
+    df_big, df_season, df_player = synthetic_career(rows, seed=options['seed'])
+    
+    backend = MockBackend(
+        latency=options['latency'], jitter=options['jitter'], error_rate=options['error_rate'],
+        rate_limit_rate=options['rate_limit_rate'], seed=options['seed']
+    )
+    llm = LLMClient(rate_limiter=RateLimiter(None, None), use_cache=False, backend=backend)
+    
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        configure_logging(stream=devnull)
+        engine = ReactionEngine(df_big, df_season, df_player, llm=llm)
+        engine.keep_in_memory = options['keep_in_memory']
+        clock = RowClock()
+        engine.sinks = [clock]
+        
+        start = time.perf_counter()
+        SCENARIOS[scenario](engine, options['personalities'])
+        elapsed = time.perf_counter() - start
+    
+    processed = len(clock.times)
+    row_latency = np.diff([start] + clock.times) * 1000
+    
+    return {
+        'scenario': scenario,
+        'rows': rows,
+        'processed': processed,
+        'elapsed': elapsed,
+        'rows_per_sec': processed / elapsed if elapsed else 0.0,
+        'p50_ms': float(np.percentile(row_latency, 50)) if processed else None,
+        'p95_ms': float(np.percentile(row_latency, 95)) if processed else None,
+        'calls_per_row': backend.calls / processed if processed else 0.0,
+        'tokens': llm.total_tokens,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def measure_startup(rows, seed=0):
+    """
+    Cold start on a synthetic career written to CSV: import, ReactionEngine()
+    and one player lookup, timed in a fresh interpreter
+    """
+    df_big, df_season, df_player = synthetic_career(rows, seed=seed)
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        df_big.to_csv(os.path.join(data_dir, 'bigmatchups.csv'), index=False)
+        df_season.to_csv(os.path.join(data_dir, 'seasonstats.csv'), index=False)
+        df_player.to_csv(os.path.join(data_dir, 'playermatchratinghistory.csv'), index=False)
+        
+        source_dir = os.path.dirname(os.path.abspath(__file__))
+        player = df_player['playername'].iloc[0]
+        output = subprocess.run(
+            [sys.executable, '-c', STARTUP_SCRIPT, source_dir, data_dir, player],
+            capture_output=True, text=True, check=True
+        ).stdout
+    
+    return dict(json.loads(output.splitlines()[-1]), rows=rows)
+
+def print_startup(result, budget_ms):
+    status = "✅" if result['total_ms'] <= budget_ms else "❌"
+    print(f"{status} cold start @ {result['rows']:,} rows: {result['total_ms']:.0f} ms "
+          f"(import {result['import_ms']:.0f} | init {result['init_ms']:.1f} | "
+          f"lookup {result['lookup_ms']:.0f}) | {result['matches']} matches | "
+          f"SDK imported: {'yes' if result['sdk_imported'] else 'no'} | budget {budget_ms:.0f} ms")
+
+def run_suite(sizes, scenarios, options, isolate=True):
+    """
+    Run every scenario at every size
+    
+    With isolate, each case runs in a fresh worker process so peak RSS is
+    measured per case rather than accumulated over the suite.
+    """
+    results = []
+    for rows in sizes:
+        for scenario in scenarios:
+            print(f"⏱️ {scenario} @ {rows:,} rows...", flush=True)
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    result = pool.submit(run_case, scenario, rows, options).result()
+            else:
+                result = run_case(scenario, rows, options)
+            results.append(result)
+            print_result(result)
+    return results
+
+def print_result(result):
+    if not result['processed']:
+        print("   no rows matched\n")
+        return
+    
+    rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else "n/a"
+    print(f"   {result['processed']:,} rows in {result['elapsed']:.2f}s | "
+          f"{result['rows_per_sec']:,.1f} rows/sec | p50 {result['p50_ms']:.2f} ms | "
+          f"p95 {result['p95_ms']:.2f} ms | {result['calls_per_row']:.2f} calls/row | peak RSS {rss}\n")
+
+def compare(results, baseline, tolerance):
+    """
+    Flag cases that got slower than the baseline by more than tolerance
+    
+    Returns:
+        list of regression messages
+    """
+    previous = {(r['scenario'], r['rows']): r for r in baseline}
+    regressions = []
+    
+    for result in results:
+        before = previous.get((result['scenario'], result['rows']))
+        if before is None or not result['processed']:
+            continue
+        
+        case = f"{result['scenario']} @ {result['rows']:,}"
+        if result['rows_per_sec'] < before['rows_per_sec'] * (1 - tolerance):
+            regressions.append(f"{case}: {before['rows_per_sec']:,.1f} → {result['rows_per_sec']:,.1f} rows/sec")
+        if before['p95_ms'] and result['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{case}: p95 {before['p95_ms']:.2f} → {result['p95_ms']:.2f} ms")
+        if before['calls_per_row'] and result['calls_per_row'] > before['calls_per_row'] * (1 + tolerance):
+            regressions.append(f"{case}: {before['calls_per_row']:.2f} → {result['calls_per_row']:.2f} calls/row")
+    
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline reaction engine throughput benchmark")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000], help="Career sizes to run")
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--no-personalities', action='store_true', help="Skip the personality panel")
+    parser.add_argument('--latency', type=float, default=0.0, help="Mock seconds per LLM call")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Mock extra latency, 0..N seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of mock calls failing")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Fraction of mock calls 429'd")
+    parser.add_argument('--keep-in-memory', action='store_true', help="Accumulate reactions_data as well")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--in-process', action='store_true', help="Run every case in this process")
+    parser.add_argument('--save', help="Write results to this JSON file")
+    parser.add_argument('--baseline', help="Compare against a saved results file")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="Allowed slowdown vs baseline")
+    parser.add_argument('--startup', action='store_true', help="Measure cold start instead of throughput")
+    parser.add_argument('--startup-budget', type=float, default=1500, help="Cold start budget, ms")
+    args = parser.parse_args(argv)
+    
+    if args.startup:
+        results = [measure_startup(rows, args.seed) for rows in args.rows]
+        for result in results:
+            print_startup(result, args.startup_budget)
+        return 0 if all(result['total_ms'] <= args.startup_budget for result in results) else 1
+    
+    options = {
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'error_rate': args.error_rate,
+        'rate_limit_rate': args.rate_limit_rate,
+        'personalities': not args.no_personalities,
+        'keep_in_memory': args.keep_in_memory,
+        'seed': args.seed
+    }
+    
+    results = run_suite(args.rows, args.scenarios, options, isolate=not args.in_process)
+    
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'options': options, 'results': results}, f, indent=2)
+        print(f"📄 Saved results: {args.save}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+        
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) vs {args.baseline}:")
+            for message in regressions:
+                print(f"   {message}")
+            return 1
+        print(f"✅ No regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,144 @@
+import json
+import os
+import random
+import threading
+from config import CHECKPOINT_FSYNC_EVERY, RUN_SEED
+
+# Columns that identify a match row, most stable first
+KEY_COLUMNS = ('artificialkey', 'playerid', 'date')
+FALLBACK_KEY_COLUMNS = ('playername', 'team', 'opponent', 'date')
+
+def _key_part(value):
+    if hasattr(value, 'item'):
+        value = value.item()  # numpy scalar
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # 5.0 and 5 are the same id
+    return str(value)
+
+def row_key(row):
+    """Stable identity for a match row (artificialkey/playerid/date when present)"""
+    columns = [c for c in KEY_COLUMNS if c in row]
+    if not columns:
+        columns = [c for c in FALLBACK_KEY_COLUMNS if c in row]
+    return '|'.join(f"{c}={_key_part(row.get(c))}" for c in columns)
+
+def row_keys(df):
+    """Vectorized row_key for a whole DataFrame, in row order"""
+    columns = [c for c in KEY_COLUMNS if c in df]
+    if not columns:
+        columns = [c for c in FALLBACK_KEY_COLUMNS if c in df]
+    parts = [[f"{c}={_key_part(v)}" for v in df[c]] for c in columns]
+    return ['|'.join(key_parts) for key_parts in zip(*parts)] if parts else [''] * len(df)
+
+def key_rng(key, purpose, seed=RUN_SEED):
+    """
+    random.Random for one row key and one use ('context', 'prompt', 'personalities', 'manager', 'player')
+    
+    Seeded from the run seed and the row's identity, so a row makes the same
+    picks in any process, shard or scheduling order. Each use gets its own
+    stream, so components can draw in any order. seed=None gives fresh
+    randomness instead.
+    """
+    if seed is None:
+        return random.Random()
+    return random.Random(f"{seed}|{purpose}|{key}")
+
+def row_rng(row, purpose, seed=RUN_SEED):
+    """key_rng for a row (see row_key)"""
+    return key_rng(row_key(row), purpose, seed)
+
+def _json_default(value):
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class ReactionJournal:
+    """
+    Append-only JSONL journal of finished reactions, keyed by row identity
+    
+    Each finished row is written (and flushed) as soon as it is done, with
+    an fsync every fsync_every entries, so a crash loses at most the rows
+    still in flight. Only each key's byte offset is kept in memory; get()
+    replays an entry from the file, so a long run or watcher stays flat.
+    """
+    
+    def __init__(self, path, fsync_every=CHECKPOINT_FSYNC_EVERY):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.offsets = {}  # key -> byte offset of its latest line
+        self._unsynced = 0
+        self._lock = threading.Lock()
+        self._reader = None
+        
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._load()
+        
+        self._file = open(path, 'ab')
+    
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        
+        offset = 0
+        torn = False
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    self.offsets[json.loads(line)['key']] = offset
+                except (ValueError, KeyError, TypeError):
+                    pass  # Torn write from a crash
+                offset += len(line)
+                torn = not line.endswith(b'\n')
+        
+        # Terminate a torn last line so the next append starts clean
+        if torn:
+            with open(self.path, 'ab') as f:
+                f.write(b'\n')
+    
+    def __contains__(self, key):
+        return key in self.offsets
+    
+    def __len__(self):
+        return len(self.offsets)
+    
+    def get(self, key):
+        """The stored entry for key, read back from the journal (None if absent)"""
+        with self._lock:
+            offset = self.offsets.get(key)
+            if offset is None:
+                return None
+            if self._reader is None:
+                self._reader = open(self.path, 'rb')
+            self._reader.seek(offset)
+            line = self._reader.readline()
+        return json.loads(line)['entry']
+    
+    def append(self, key, entry):
+        """Record a finished reaction"""
+        line = json.dumps({'key': key, 'entry': entry}, ensure_ascii=False, default=_json_default)
+        
+        with self._lock:
+            self.offsets[key] = self._file.tell()
+            self._file.write(line.encode('utf-8') + b'\n')
+            self._file.flush()
+            
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+    
+    def sync(self):
+        """Force everything written so far to disk"""
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+    
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
\ No newline at end of file
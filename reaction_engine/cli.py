@@ -0,0 +1,247 @@
+"""
+Command-line entry point for every batch mode - no source edits needed.
+
+    python cli.py batch --max-rows 100 --concurrency 8
+    python cli.py rivalry --no-personalities --formats jsonl csv
+    python cli.py highlights --min-rating 8.5 --rps 0.5
+    python cli.py player "Messi" --resume
+    python cli.py sharded --workers 4 --shard-by team
+    python cli.py serve --port 8080
+    python cli.py watch --export COMBINED_EXPORT.csv
+
+The input, output and cache folders come from flags, or from the
+REACTION_DATA_DIR, REACTION_OUTPUT_DIR and REACTION_CACHE_DIR environment
+variables; a flag wins over its variable. Logs go to stderr. A run ends
+by printing one JSON summary (throughput and token usage) to stdout. The
+exit status is 1 if any row failed, 0 otherwise.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+OUTPUT_FORMATS = ['all', 'commentator', 'journalist', 'fan_tweet', 'personalities']
+STREAM_CHOICES = ['jsonl', 'txt', 'personalities', 'csv']
+
+# Path flags become environment variables, so config picks them up when it is first imported
+PATH_FLAGS = (
+    ('input_dir', 'REACTION_DATA_DIR'),
+    ('output_dir', 'REACTION_OUTPUT_DIR'),
+    ('cache_dir', 'REACTION_CACHE_DIR'),
+    ('export', 'REACTION_COMBINED_EXPORT')
+)
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--input-dir', help="Folder with the exported CSVs (REACTION_DATA_DIR)")
+    common.add_argument('--output-dir', help="Folder for reactions, journals and metrics (REACTION_OUTPUT_DIR)")
+    common.add_argument('--cache-dir', help="Folder for the LLM response cache (REACTION_CACHE_DIR)")
+    common.add_argument('--no-cache', action='store_true', help="Skip the LLM response cache")
+    common.add_argument('--backend', choices=['groq', 'mock'], help="LLM backend (LLM_BACKEND)")
+    common.add_argument('--concurrency', type=int, help="LLM requests in flight (batch modes: 1 = sequential)")
+    common.add_argument('--rps', type=float, help="API requests per second (0 = unlimited; default from config)")
+    common.add_argument('--tpm', type=int, help="API tokens per minute (0 = unlimited; default from config)")
+    common.add_argument('--log-format', choices=['emoji', 'json'], help="Log line format (stderr)")
+    common.add_argument('--quiet', action='store_true', help="Only progress, summaries, warnings and errors")
+    
+    batch = argparse.ArgumentParser(add_help=False)
+    batch.add_argument('--max-rows', type=int, help="Stop after this many rows")
+    batch.add_argument('--formats', nargs='+', choices=STREAM_CHOICES, help="Output files to write")
+    batch.add_argument('--output-format', choices=OUTPUT_FORMATS, default='all', help="Reaction tones")
+    batch.add_argument('--no-personalities', action='store_true', help="Skip the personality panel")
+    batch.add_argument('--resume', action='store_true', help="Skip rows already in the checkpoint journal")
+    
+    parser = argparse.ArgumentParser(description="FIFA career reaction engine")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    commands.add_parser('batch', parents=[common, batch], help="Every match row")
+    commands.add_parser('rivalry', parents=[common, batch], help="Big rivalry matches only")
+    
+    highlights = commands.add_parser('highlights', parents=[common, batch], help="Standout performances only")
+    highlights.add_argument('--min-rating', type=float, default=8.0)
+    
+    player = commands.add_parser('player', parents=[common, batch], help="One player's matches")
+    player.add_argument('name')
+    
+    sharded = commands.add_parser('sharded', parents=[common, batch], help="Every match row, across processes")
+    sharded.add_argument('--workers', type=int, help="Worker processes (default SHARD_WORKERS)")
+    sharded.add_argument('--shard-by', choices=['team', 'date', 'rows'])
+    
+    serve = commands.add_parser('serve', parents=[common], help="HTTP reaction service")
+    serve.add_argument('--host')
+    serve.add_argument('--port', type=int)
+    
+    watch = commands.add_parser('watch', parents=[common], help="React to new Lua exports as they land")
+    watch.add_argument('--export', help="Combined export to watch (REACTION_COMBINED_EXPORT)")
+    watch.add_argument('--no-personalities', action='store_true', help="Skip the personality panel")
+    
+    return parser
+
+def make_llm(args):
+    """LLMClient with the run's rate limits"""
+    from config import RATE_LIMIT_RPM, RATE_LIMIT_TPM
+    from llm_client import LLMClient
+    from rate_limiter import RateLimiter
+    
+    rpm, tpm = rate_limits(args, RATE_LIMIT_RPM, RATE_LIMIT_TPM)
+    llm = LLMClient(rate_limiter=RateLimiter(rpm, tpm))
+    if args.concurrency:
+        llm.max_in_flight = args.concurrency
+    return llm
+
+def rate_limits(args, default_rpm, default_tpm):
+    """(rpm, tpm) from --rps/--tpm, falling back to config; 0 means unlimited (None)"""
+    rpm = default_rpm if args.rps is None else (args.rps * 60 or None)
+    tpm = default_tpm if args.tpm is None else (args.tpm or None)
+    return rpm, tpm
+
+def summarize(command, rows, reactions, elapsed, requests, tokens, **extra):
+    summary = {
+        'command': command,
+        'rows': rows,
+        'reactions': reactions,
+        'failed': max(rows - reactions, 0),
+        'elapsed_s': round(elapsed, 3),
+        'rows_per_sec': round(reactions / elapsed, 3) if elapsed else 0.0,
+        'requests': requests,
+        'total_tokens': tokens,
+        'tokens_per_sec': round(tokens / elapsed, 1) if elapsed else 0.0
+    }
+    summary.update(extra)
+    return summary
+
+def run_batch(args):
+    """batch / rivalry / highlights / player in this process"""
+    from config import CHECKPOINT_JOURNAL, STREAM_FORMATS
+    from reaction_engine import ReactionEngine
+    
+    engine = ReactionEngine(llm=make_llm(args))
+    
+    if args.command == 'rivalry':
+        df = engine.rivalry_rows()
+    elif args.command == 'highlights':
+        df = engine.highlight_rows(args.min_rating)
+    elif args.command == 'player':
+        df = engine.player_rows(args.name)
+    else:
+        df = engine.df_player
+    
+    if args.max_rows:
+        df = df.head(args.max_rows)
+    
+    if not args.resume and os.path.exists(CHECKPOINT_JOURNAL):
+        os.remove(CHECKPOINT_JOURNAL)
+    
+    options = {
+        'output_format': args.output_format,
+        'include_personalities': not args.no_personalities,
+        'checkpoint': True
+    }
+    
+    engine.stream_outputs(args.formats or STREAM_FORMATS)
+    start = time.time()
+    try:
+        if args.concurrency and args.concurrency > 1:
+            engine.process_batch_async(df, max_concurrency=args.concurrency, **options)
+        else:
+            engine.process_batch(df, **options)
+    finally:
+        elapsed = time.time() - start
+        engine.close_outputs()
+    
+    stats = engine.llm.get_stats()
+    return summarize(
+        args.command, len(df), engine.recorded_count, elapsed, stats['requests'], stats['total_tokens'],
+        concurrency=args.concurrency or 1, llm=stats
+    )
+
+def run_sharded(args):
+    from config import RATE_LIMIT_RPM, RATE_LIMIT_TPM, SHARD_WORKERS, SHARD_BY, STREAM_FORMATS, MAX_CONCURRENT_REQUESTS
+    from sharded_runner import ShardedRunner
+    
+    rpm, tpm = rate_limits(args, RATE_LIMIT_RPM, RATE_LIMIT_TPM)
+    runner = ShardedRunner(num_shards=args.workers or SHARD_WORKERS, shard_by=args.shard_by or SHARD_BY,
+                           requests_per_minute=rpm, tokens_per_minute=tpm)
+    result = runner.run(
+        max_rows=args.max_rows, output_format=args.output_format,
+        include_personalities=not args.no_personalities,
+        use_async=bool(args.concurrency and args.concurrency > 1),
+        max_concurrency=args.concurrency or MAX_CONCURRENT_REQUESTS,
+        formats=args.formats or STREAM_FORMATS, resume=args.resume
+    )
+    
+    shards = result['shards']
+    return summarize(
+        'sharded', sum(s['rows'] for s in shards), result['reactions'], result['elapsed'],
+        sum(s['requests'] for s in shards), sum(s['tokens'] for s in shards),
+        workers=len(shards), shards=shards, llm=result['usage']
+    )
+
+def run_serve(args):
+    import asyncio
+    from config import SERVICE_HOST, SERVICE_PORT
+    from reaction_engine import ReactionEngine
+    from reaction_service import ReactionService
+    
+    service = ReactionService(ReactionEngine(llm=make_llm(args)))
+    start = time.time()
+    try:
+        asyncio.run(service.serve(args.host or SERVICE_HOST, args.port or SERVICE_PORT))
+    except KeyboardInterrupt:
+        pass
+    
+    stats = service.engine.llm.get_stats()
+    return summarize(
+        'serve', service.stats['rows_generated'] + service.stats['errors'], service.stats['rows_generated'],
+        time.time() - start, stats['requests'], stats['total_tokens'], service=service.stats
+    )
+
+def run_watch(args):
+    from export_watcher import ExportWatcher
+    
+    watcher = ExportWatcher(include_personalities=not args.no_personalities, llm=make_llm(args))
+    start = time.time()
+    watcher.run()
+    
+    stats = watcher.llm.get_stats()
+    return summarize(
+        'watch', watcher.reactions_generated, watcher.reactions_generated, time.time() - start,
+        stats['requests'], stats['total_tokens']
+    )
+
+COMMANDS = {
+    'batch': run_batch,
+    'rivalry': run_batch,
+    'highlights': run_batch,
+    'player': run_batch,
+    'sharded': run_sharded,
+    'serve': run_serve,
+    'watch': run_watch
+}
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    
+    # Before anything imports config
+    for flag, variable in PATH_FLAGS:
+        value = getattr(args, flag, None)
+        if value:
+            os.environ[variable] = os.path.abspath(value)
+    if args.backend:
+        os.environ['LLM_BACKEND'] = args.backend
+    if args.no_cache:
+        os.environ['REACTION_RESPONSE_CACHE'] = '0'
+    
+    from config import LOG_FORMAT, LOG_LEVEL
+    from engine_logging import configure_logging
+    configure_logging(LOG_LEVEL, args.log_format or LOG_FORMAT, quiet=args.quiet, stream=sys.stderr)
+    
+    summary = COMMANDS[args.command](args)
+    
+    print(json.dumps(summary, default=str))
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
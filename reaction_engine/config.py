@@ -1,33 +1,132 @@
 import os
-from dotenv import load_dotenv
+
+def _load_dotenv():
+    """Load the nearest .env (searching up from here, like load_dotenv()); python-dotenv is only imported if one exists"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
 
 # Load environment variables
-load_dotenv()
+_load_dotenv()
 
 # API Configuration
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "your-groq-api-key-here")
 GROQ_MODEL = "llama-3.3-70b-versatile"  # Fast and powerful for sports commentary
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")  # Point at a local fake server for benchmarking (None = Groq cloud)
 
 # Paths
-BASE_DIR = r"D:\Projects\Fifa15_AI\exported_data"
+BASE_DIR = os.getenv("REACTION_DATA_DIR", r"D:\Projects\Fifa15_AI\exported_data")
 BIGMATCHUPS_CSV = os.path.join(BASE_DIR, "bigmatchups.csv")
 SEASONSTATS_CSV = os.path.join(BASE_DIR, "seasonstats.csv")
 PLAYERMATCH_CSV = os.path.join(BASE_DIR, "playermatchratinghistory.csv")
+COMBINED_EXPORT_CSV = os.getenv("REACTION_COMBINED_EXPORT", r"D:\Projects\Fifa15_AI\COMBINED_EXPORT.csv")  # All sheets in one file (see export_splitter.py)
+
+# Typed data cache written next to the CSVs (see data_cache.py)
+ENABLE_DATA_CACHE = True  # Load the cache when it is at least as new as its CSV
+DATA_CACHE_FORMAT = 'auto'  # 'parquet' (needs pyarrow), 'pickle', or 'auto'
 
-OUTPUT_DIR = r"D:\Projects\Fifa15_AI\reaction_engine\outputs"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_DIR = os.getenv("REACTION_OUTPUT_DIR", r"D:\Projects\Fifa15_AI\reaction_engine\outputs")  # Created by the writers on first output
 
 # Output files
 REACTIONS_TXT = os.path.join(OUTPUT_DIR, "reactions.txt")
 REACTIONS_JSON = os.path.join(OUTPUT_DIR, "reactions.json")
 REACTIONS_CSV = os.path.join(OUTPUT_DIR, "reactions_export.csv")
 PERSONALITIES_TXT = os.path.join(OUTPUT_DIR, "personality_reactions.txt")
+REACTIONS_JSONL = os.path.join(OUTPUT_DIR, "reactions.jsonl")  # Streaming mode
+
+# Streaming Output
+STREAM_FORMATS = ['jsonl', 'txt', 'personalities', 'csv']
+OUTPUT_BUFFER_SIZE = 25  # Entries buffered per sink before a write
 
 # LLM Settings
 MAX_TOKENS = 350
 TEMPERATURE = 0.85  # High creativity for varied reactions
 TOP_P = 0.9
 
+# Rate Limiting (Groq free tier for llama-3.3-70b - raise for paid plans, None = unlimited)
+RATE_LIMIT_RPM = 30  # Requests per minute
+RATE_LIMIT_TPM = 12000  # Tokens per minute (prompt + completion)
+MAX_RATE_LIMIT_RETRIES = 5  # Retries on 429 before falling back
+RETRY_BASE_DELAY = 1.0  # Seconds, doubled per retry (with jitter)
+RETRY_MAX_DELAY = 30.0
+
+# Response Cache (re-runs with identical prompts skip the API)
+# Entries are keyed by row as well as prompt: re-running a row reuses its reaction word for word
+# (set LLMClient.bypass_cache for fresh takes), but rows that build the same prompt never share one
+ENABLE_RESPONSE_CACHE = os.getenv("REACTION_RESPONSE_CACHE", "1") != "0"
+RESPONSE_CACHE_DB = os.path.join(os.getenv("REACTION_CACHE_DIR", OUTPUT_DIR), "response_cache.sqlite3")
+RESPONSE_CACHE_MAX_ENTRIES = 200000
+RESPONSE_CACHE_MAX_AGE_DAYS = 30  # None = never expire
+
+# Checkpointing (resume a crashed or re-run batch instead of restarting)
+CHECKPOINT_JOURNAL = os.path.join(OUTPUT_DIR, "reactions_journal.jsonl")
+CHECKPOINT_FSYNC_EVERY = 10  # fsync the journal every N finished rows
+
+# Multi-Tone Generation
+MULTI_TONE_SINGLE_REQUEST = False  # All three tones in one JSON request (falls back to per-tone calls)
+MULTI_TONE_MAX_TOKENS = 900  # Room for three reactions in one response
+
+# Personality Panel Generation
+PANEL_SINGLE_REQUEST = False  # Pundits, manager and teammate in one JSON request (falls back to separate calls)
+PANEL_CONCURRENT_CALLS = True  # Otherwise run the five separate calls concurrently
+PANEL_MAX_TOKENS = 1200  # Room for five reactions in one response
+
+# LLM Backend
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")  # 'groq', or 'mock' for offline runs/benchmarks
+MOCK_LLM_LATENCY = 0.0  # Seconds per mock completion
+MOCK_LLM_JITTER = 0.0  # Extra random latency, 0..N seconds
+MOCK_LLM_ERROR_RATE = 0.0  # Fraction of mock calls failing with a 500
+MOCK_LLM_RATE_LIMIT_RATE = 0.0  # Fraction of mock calls answered with a 429
+MOCK_LLM_COMPLETION_TOKENS = 80  # Typical mock completion length
+
+# HTTP Connection Pool (Groq backend, see http_pool.py)
+HTTP_MAX_CONNECTIONS = None  # Open connections at once (None = the client's max in-flight requests)
+HTTP_KEEPALIVE_EXPIRY = 60.0  # Seconds an idle connection is kept for reuse
+HTTP_CONNECT_TIMEOUT = 5.0  # Seconds to open a connection (TCP + TLS)
+HTTP_READ_TIMEOUT = 60.0  # Seconds to wait for a response
+HTTP_POOL_TIMEOUT = 30.0  # Seconds to wait for a free pooled connection before failing
+
+# Instrumentation
+ENABLE_INSTRUMENTATION = True  # Per-stage timing histograms
+METRICS_JSON = os.path.join(OUTPUT_DIR, "metrics.json")
+METRICS_PROM = os.path.join(OUTPUT_DIR, "metrics.prom")  # Prometheus text format
+PROFILE_EVERY_N_ROWS = 0  # cProfile one row in every N (0 = off)
+PROFILE_DIR = os.path.join(OUTPUT_DIR, "profiles")
+
+# Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "emoji")  # 'emoji' (console) or 'json' (job runners)
+LOG_QUIET = False  # Production batches: progress, summaries, warnings and errors only
+PROGRESS_INTERVAL = 5.0  # Seconds between progress lines
+
+# Async Batch Settings
+MAX_CONCURRENT_REQUESTS = 8  # Max in-flight LLM requests in process_batch_async
+
+# Watch Mode (export_watcher.py)
+WATCH_INTERVAL = 2.0  # Seconds between checks of the combined export
+WATCH_SETTLE = 0.5  # Export must be unchanged this long before it is read (the Lua script may still be writing)
+WATCH_JOURNAL = os.path.join(OUTPUT_DIR, "watch_journal.jsonl")  # Rows already reacted to, across restarts
+
+# HTTP Service (reaction_service.py)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8080
+SERVICE_WORKERS = 8  # Rows generated at once
+SERVICE_QUEUE_SIZE = 64  # Rows allowed to wait beyond that - requests that would overflow get a 503
+SERVICE_MAX_ROWS = 50  # Cap on rows per player/highlights/rivalry request
+
+# Sharded Runner Settings
+SHARD_WORKERS = 4  # Worker processes for sharded_runner
+SHARD_BY = 'team'  # 'team', 'date' or 'rows'
+SHARD_DIR = os.path.join(OUTPUT_DIR, "shards")  # Per-shard journals
+
 # Feature Flags
 ENABLE_CONTEXT_MEMORY = True  # Remember recent performances
 ENABLE_RIVALRY_DETECTION = True
@@ -39,4 +138,9 @@ ENABLE_PERSONALITY_REACTIONS = True  # NEW: Multi-personality reactions
 NUM_PUNDITS = 3  # Number of pundits per match
 INCLUDE_MANAGER_REACTION = True
 INCLUDE_PLAYER_REACTION = True
-PERSONALITY_VARIETY_WINDOW = 10  # Avoid repeating same personality within N matches
\ No newline at end of file
+PERSONALITY_VARIETY_WINDOW = 10  # Avoid repeating same personality within N matches
+
+# Reproducibility
+# Each row's random picks (home/away, prompt tone and focus, panel) are seeded from RUN_SEED plus the
+# row's identity: same seed + same row = same prompts, so re-runs hit the response cache
+RUN_SEED = 0  # None = fresh picks every run
\ No newline at end of file
@@ -1,34 +1,87 @@
+import numpy as np
 import pandas as pd
-import random
+from config import RUN_SEED
+from checkpoint import key_rng, row_keys, row_rng
+
+# Returned by get_team_stats for teams missing from the season table
+DEFAULT_TEAM_STATS = {'points': 0, 'wins': 0, 'draws': 0, 'losses': 0, 'goals_for': 0, 'goals_against': 0}
+
+HOME_AWAY = ('Home', 'Away')
 
 class MatchContextAnalyzer:
     """Analyzes match context to add narrative depth"""
     
-    def __init__(self, df_big, df_season, df_player):
+    def __init__(self, df_big, df_season, df_player, seed=RUN_SEED):
         self.df_big = df_big
         self.df_season = df_season
         self.df_player = df_player
         self.player_memory = {}  # Track recent performances
+        self.seed = seed  # Per-row picks (see checkpoint.row_rng)
+        
+        # Unordered team-pair index, built once so rivalry checks are O(1)
+        self.rivalry_pairs = {
+            frozenset(pair) for pair in zip(df_big['teamid1'].tolist(), df_big['teamid2'].tolist())
+        }
+        self._rivalry_keys = pd.MultiIndex.from_tuples(
+            [(min(pair), max(pair)) for pair in self.rivalry_pairs],
+            names=['lo', 'hi']
+        ) if self.rivalry_pairs else None
+        
+        # team -> season stats row (first row per team, as before)
+        self.team_stats_index = {
+            stats['team']: stats
+            for stats in df_season.drop_duplicates('team').to_dict('records')
+        } if 'team' in df_season else {}
         
+        # Per-team / per-player recent-form lookups, built on first use
+        self._team_form_index = None
+        self._player_context_index = None
+    
     def is_big_match(self, team_id, opponent_id):
         """Check if this is a rivalry/big matchup"""
-        return ((self.df_big['teamid1'] == team_id) & (self.df_big['teamid2'] == opponent_id)).any() or \
-               ((self.df_big['teamid2'] == team_id) & (self.df_big['teamid1'] == opponent_id)).any()
+        return frozenset((team_id, opponent_id)) in self.rivalry_pairs
+    
+    def flag_big_matches(self, df):
+        """
+        Vectorized is_big_match for a whole DataFrame
+        
+        Returns a boolean Series aligned to df.index
+        """
+        if self._rivalry_keys is None or df.empty:
+            return pd.Series(False, index=df.index)
+        
+        team_ids = df['teamid'] if 'teamid' in df else pd.Series(0, index=df.index)
+        opponent_ids = df['opponentid'] if 'opponentid' in df else pd.Series(0, index=df.index)
+        
+        # Order each pair the same way the index does
+        lo = np.minimum(team_ids.to_numpy(), opponent_ids.to_numpy())
+        hi = np.maximum(team_ids.to_numpy(), opponent_ids.to_numpy())
+        
+        flags = pd.MultiIndex.from_arrays([lo, hi]).isin(self._rivalry_keys)
+        return pd.Series(flags, index=df.index)
     
     def get_team_stats(self, team_name):
-        """Get team's season statistics"""
-        row = self.df_season[self.df_season['team'] == team_name]
-        if not row.empty:
-            return row.iloc[0].to_dict()
-        return {'points': 0, 'wins': 0, 'draws': 0, 'losses': 0, 'goals_for': 0, 'goals_against': 0}
+        """Get team's season statistics (shared dict - treat as read-only)"""
+        return self.team_stats_index.get(team_name, DEFAULT_TEAM_STATS)
     
     def get_team_form(self, team_name):
         """Calculate recent form (last 5 matches)"""
-        team_matches = self.df_player[self.df_player['team'] == team_name].tail(5)
-        if team_matches.empty:
-            return "Unknown"
-        
-        wins = (team_matches['goals'] > 0).sum()  # Simplified
+        return self.team_form_index.get(team_name, "Unknown")
+    
+    @property
+    def team_form_index(self):
+        """team -> form label over the team's last 5 matches"""
+        if self._team_form_index is None:
+            if 'team' not in self.df_player:
+                self._team_form_index = {}
+            else:
+                recent = self.df_player.groupby('team', sort=False, observed=True).tail(5)
+                wins = (recent['goals'] > 0).groupby(recent['team'], sort=False, observed=True).sum()  # Simplified
+                self._team_form_index = {team: self._form_label(w) for team, w in wins.items()}
+        return self._team_form_index
+    
+    @staticmethod
+    def _form_label(wins):
         if wins >= 4:
             return "🔥 Red Hot"
         elif wins >= 3:
@@ -76,21 +129,23 @@ class MatchContextAnalyzer:
     
     def get_player_context(self, player_name):
         """Get player's recent history"""
-        player_matches = self.df_player[
-            self.df_player['playername'] == player_name
-        ].tail(3)
-        
-        if player_matches.empty:
-            return None
-        
-        total_goals = player_matches['goals'].sum()
-        avg_rating = player_matches['rating'].mean()
-        
-        return {
-            'recent_goals': total_goals,
-            'avg_rating': round(avg_rating, 1),
-            'matches': len(player_matches)
-        }
+        return self.player_context_index.get(player_name)
+    
+    @property
+    def player_context_index(self):
+        """playername -> goals/avg rating over the player's last 3 matches"""
+        if self._player_context_index is None:
+            if 'playername' not in self.df_player:
+                self._player_context_index = {}
+            else:
+                recent = self.df_player.groupby('playername', sort=False, observed=True).tail(3)
+                grouped = recent.groupby('playername', sort=False, observed=True)
+                self._player_context_index = pd.DataFrame({
+                    'recent_goals': grouped['goals'].sum(),
+                    'avg_rating': grouped['rating'].mean().round(1),
+                    'matches': grouped.size()
+                }).to_dict('index')
+        return self._player_context_index
     
     def compare_with_opponent(self, team_stats, opponent_name):
         """Compare team standings"""
@@ -124,11 +179,93 @@ class MatchContextAnalyzer:
                 team_stats, 
                 row.get('opponent', '')
             ),
-            'home_away': random.choice(['Home', 'Away'])  # Add if you have this data
+            'home_away': row_rng(row, 'context', self.seed).choice(HOME_AWAY)  # Add if you have this data
         }
         
         return tags
     
+    def generate_context_tags_batch(self, df):
+        """
+        Vectorized generate_context_tags for a whole DataFrame
+        
+        Team form, recent player context and team points are looked up from
+        per-key indexes (one groupby each) instead of rescanning the tables
+        per row.
+        
+        Returns:
+            DataFrame aligned to df.index, one column per tag
+        """
+        def column(name, default):
+            if name not in df:
+                return pd.Series(default, index=df.index)
+            # Categorical names (typed data cache) are mapped as plain values
+            return df[name].astype(object) if isinstance(df[name].dtype, pd.CategoricalDtype) else df[name]
+        
+        teams = column('team', '')
+        
+        # Points for every team that appears on either side, fetched once per team
+        points = {
+            team: self.get_team_stats(team).get('points', 0)
+            for team in pd.unique(pd.concat([teams, column('opponent', '')]))
+        }
+        team_pts = teams.map(points).to_numpy(dtype=float)
+        opp_pts = column('opponent', '').map(points).to_numpy(dtype=float)
+        
+        competitiveness = np.select(
+            [team_pts > opp_pts + 10, team_pts > opp_pts + 5,
+             np.abs(team_pts - opp_pts) <= 5, opp_pts > team_pts + 5],
+            ["DOMINANT_FAVORITE", "FAVORITE", "EVENLY_MATCHED", "UNDERDOG"],
+            default="MAJOR_UNDERDOG"
+        )
+        
+        player_context = [
+            ctx if isinstance(ctx, dict) else None
+            for ctx in column('playername', '').map(self.player_context_index)
+        ]
+        
+        return pd.DataFrame({
+            'is_big_match': self.flag_big_matches(df),
+            'team_form': teams.map(self.team_form_index).fillna("Unknown"),
+            'performance_narratives': self.detect_performance_narratives_batch(df),
+            'player_context': player_context,
+            'match_competitiveness': competitiveness,
+            # Same per-row draw as generate_context_tags; add real data if you have it
+            'home_away': [key_rng(key, 'context', self.seed).choice(HOME_AWAY) for key in row_keys(df)]
+        }, index=df.index)
+    
+    def detect_performance_narratives_batch(self, df):
+        """Vectorized detect_performance_narrative; returns a list per row"""
+        def numeric(name):
+            if name not in df:
+                return np.zeros(len(df))
+            return pd.to_numeric(df[name], errors='coerce').fillna(0).to_numpy()
+        
+        goals = numeric('goals')
+        mins = numeric('minsplayed')
+        
+        # Only numeric ratings count, as in the per-row check
+        if 'rating' in df and pd.api.types.is_numeric_dtype(df['rating']):
+            rating = df['rating'].to_numpy(dtype=float)
+        elif 'rating' in df:
+            rating = np.array([
+                v if isinstance(v, (int, float)) else np.nan for v in df['rating']
+            ], dtype=float)
+        else:
+            rating = np.zeros(len(df))
+        
+        motm = (df['MOTM'] == 'Yes').to_numpy() if 'MOTM' in df else np.zeros(len(df), dtype=bool)
+        
+        labels = [
+            np.select([goals >= 3, goals == 2], ["HAT_TRICK", "BRACE"], default=""),
+            np.select([rating >= 9.0, rating >= 8.5, rating < 6.0],
+                      ["WORLD_CLASS", "EXCEPTIONAL", "POOR"], default=""),
+            np.where(mins >= 90, "FULL_NINETY", ""),
+            np.where(motm, "MOTM", ""),
+            np.where((mins > 0) & (mins < 30), "CAMEO", "")
+        ]
+        
+        return [[label for label in row_labels if label] for row_labels in zip(*labels)]
+    
     def build_narrative_string(self, tags):
         """Convert context tags to natural language prompt additions"""
         parts = []
@@ -0,0 +1,202 @@
+"""
+Typed, columnar cache of the exported career tables.
+
+Each CSV is converted once into a file next to it, with explicit dtypes:
+small integer types, float64 ratings, and categorical team and player
+names. The cache is Parquet if pyarrow is installed and a pickle
+otherwise. load_table reads the cache whenever it is at least as new as
+its CSV, and rebuilds it when it is not. Run this module to convert all
+three tables and compare them with plain CSV loads:
+
+    python data_cache.py
+"""
+import os
+import sys
+import time
+import pandas as pd
+from config import (
+    BIGMATCHUPS_CSV, SEASONSTATS_CSV, PLAYERMATCH_CSV, ENABLE_DATA_CACHE, DATA_CACHE_FORMAT
+)
+from engine_logging import get_logger, configure_logging
+
+logger = get_logger('data')
+
+# Known columns of each export (by CSV name); anything else keeps pandas' inferred type.
+# Ratings stay float64 so values like 7.4 come back exactly in prompts and outputs.
+SCHEMAS = {
+    'bigmatchups': {
+        'teamid1': 'int32',
+        'teamid2': 'int32'
+    },
+    'seasonstats': {
+        'position': 'category',
+        'playerid': 'int32',
+        'playername': 'category',
+        'team': 'category',
+        'competition': 'category',
+        'appearances': 'int16',
+        'AVG': 'float64',
+        'MOTMs': 'int16',
+        'goals': 'int16',
+        'assists': 'int16',
+        'yellow_cards': 'int16',
+        'two_yellow': 'int16',
+        'red_cards': 'int16',
+        'saves': 'int16',
+        'goals_conceded': 'int16',
+        'cleansheets': 'int16',
+        'points': 'int16',
+        'wins': 'int16',
+        'draws': 'int16',
+        'losses': 'int16',
+        'goals_for': 'int16',
+        'goals_against': 'int16'
+    },
+    'playermatchratinghistory': {
+        'rating': 'float64',
+        'minsplayed': 'int16',
+        'playerid': 'int32',
+        'position': 'int16',
+        'artificialkey': 'int64',
+        'date': 'int32',
+        'playername': 'category',
+        'team': 'category',
+        'teamid': 'int32',
+        'opponent': 'category',
+        'opponentid': 'int32',
+        'goals': 'int16',
+        'MOTM': 'category'
+    }
+}
+
+CACHE_EXTENSIONS = {
+    'parquet': '.parquet',
+    'pickle': '.pkl'
+}
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def cache_format(fmt=DATA_CACHE_FORMAT):
+    """Resolve 'auto' to 'parquet' when pyarrow is installed, else 'pickle'"""
+    if fmt == 'auto':
+        return 'parquet' if _has_pyarrow() else 'pickle'
+    if fmt not in CACHE_EXTENSIONS:
+        raise ValueError(f"Unknown data cache format: {fmt} (expected 'auto', 'parquet' or 'pickle')")
+    return fmt
+
+def cache_path(csv_path, fmt=DATA_CACHE_FORMAT):
+    """Cache file next to csv_path"""
+    return os.path.splitext(csv_path)[0] + CACHE_EXTENSIONS[cache_format(fmt)]
+
+def schema_for(csv_path):
+    return SCHEMAS.get(os.path.splitext(os.path.basename(csv_path))[0].lower(), {})
+
+def apply_schema(df, schema):
+    """Cast the schema's columns that are present; integer columns with gaps become float64"""
+    for column, dtype in schema.items():
+        if column not in df:
+            continue
+        try:
+            df[column] = df[column].astype(dtype)
+        except (ValueError, TypeError):
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+    return df
+
+def read_csv_typed(csv_path):
+    """Read an export CSV straight into the schema's dtypes"""
+    schema = schema_for(csv_path)
+    
+    # Categoricals and floats can be parsed directly; integers are cast after, since a gap would fail the parse
+    direct = {column: dtype for column, dtype in schema.items() if dtype in ('category', 'float64')}
+    df = pd.read_csv(csv_path, dtype=direct)
+    return apply_schema(df, schema)
+
+def _write(df, path, fmt):
+    # Write then rename, so a parallel reader (e.g. a shard worker) never sees half a file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if fmt == 'parquet':
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+def _read(path, fmt):
+    if fmt == 'parquet':
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+def convert(csv_path, fmt=DATA_CACHE_FORMAT):
+    """
+    Rebuild the cache for one CSV
+    
+    Returns:
+        DataFrame: the typed table
+    """
+    fmt = cache_format(fmt)
+    df = read_csv_typed(csv_path)
+    _write(df, cache_path(csv_path, fmt), fmt)
+    return df
+
+def is_fresh(csv_path, fmt=DATA_CACHE_FORMAT):
+    """True if the cache exists and is at least as new as its CSV (or the CSV is gone)"""
+    path = cache_path(csv_path, fmt)
+    if not os.path.exists(path):
+        return False
+    return not os.path.exists(csv_path) or os.path.getmtime(path) >= os.path.getmtime(csv_path)
+
+def load_table(csv_path, use_cache=ENABLE_DATA_CACHE, fmt=DATA_CACHE_FORMAT):
+    """
+    Load an export table: from the cache when it is fresh, otherwise from
+    the CSV (refreshing the cache on the way)
+    """
+    if not use_cache:
+        return read_csv_typed(csv_path)
+    
+    fmt = cache_format(fmt)
+    if is_fresh(csv_path, fmt):
+        return _read(cache_path(csv_path, fmt), fmt)
+    
+    try:
+        return convert(csv_path, fmt)
+    except OSError as e:
+        # Read-only export folder etc. - still serve the typed table
+        logger.warning("⚠️ Could not write data cache for %s: %s", csv_path, e)
+        return read_csv_typed(csv_path)
+
+def main(paths=None, fmt=DATA_CACHE_FORMAT):
+    """Convert the export CSVs and report load time and memory against plain CSV"""
+    configure_logging()
+    fmt = cache_format(fmt)
+    print(f"🗜️ Converting exports to {fmt}...\n")
+    
+    for csv_path in paths or (BIGMATCHUPS_CSV, SEASONSTATS_CSV, PLAYERMATCH_CSV):
+        if not os.path.exists(csv_path):
+            print(f"⚠️  Skipping {csv_path} - not found")
+            continue
+        
+        start = time.perf_counter()
+        plain = pd.read_csv(csv_path)
+        csv_seconds = time.perf_counter() - start
+        
+        convert(csv_path, fmt)
+        
+        start = time.perf_counter()
+        typed = _read(cache_path(csv_path, fmt), fmt)
+        cache_seconds = time.perf_counter() - start
+        
+        csv_mb = plain.memory_usage(deep=True).sum() / 2**20
+        cache_mb = typed.memory_usage(deep=True).sum() / 2**20
+        print(f"✅ {os.path.basename(cache_path(csv_path, fmt))}: {len(typed):,} rows")
+        print(f"   Load: {csv_seconds * 1000:.1f} ms (CSV) → {cache_seconds * 1000:.1f} ms (cache)")
+        print(f"   Memory: {csv_mb:.1f} MB (CSV) → {cache_mb:.1f} MB (typed)")
+    
+    print("\n🎉 Data cache ready!")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or None)
\ No newline at end of file
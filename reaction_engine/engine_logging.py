@@ -0,0 +1,168 @@
+"""
+Logging for the reaction engine.
+
+Every module logs under the 'reaction_engine' logger tree. The default
+formatter writes the plain emoji messages the engine has always printed;
+the JSON formatter writes one object per line for job runners. Per-row
+detail goes to the module loggers, while progress and run summaries go to
+'reaction_engine.progress', so quiet mode can drop the former and keep the
+latter.
+
+Importing the engine only attaches a NullHandler, so an application that
+embeds it keeps control of logging (records propagate to its handlers).
+Entry points call configure_logging() to get the engine's own output.
+"""
+import json
+import logging
+import sys
+import time
+from config import LOG_LEVEL, LOG_FORMAT, LOG_QUIET, PROGRESS_INTERVAL
+
+ROOT_LOGGER = 'reaction_engine'
+PROGRESS_LOGGER = f'{ROOT_LOGGER}.progress'
+
+class EmojiFormatter(logging.Formatter):
+    """Classic console output: just the message"""
+    
+    def format(self, record):
+        text = record.getMessage()
+        if record.exc_info:
+            text = f"{text}\n{self.formatException(record.exc_info)}"
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; structured values come from extra={'fields': {...}}"""
+    
+    def format(self, record):
+        data = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage().strip()
+        }
+        data.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+FORMATTERS = {
+    'emoji': EmojiFormatter,
+    'json': JsonFormatter
+}
+
+_handler = None
+_settings = None
+
+# Library default: silent unless the host app or an entry point configures logging
+logging.getLogger(ROOT_LOGGER).addHandler(logging.NullHandler())
+
+def configure_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, quiet=LOG_QUIET, stream=None):
+    """
+    (Re)configure engine logging
+    
+    Args:
+        level: Level name or number for the engine loggers
+        fmt: 'emoji' (console) or 'json' (job runners)
+        quiet: Drop per-row detail; keep progress, summaries, warnings and errors
+        stream: Output stream (default stdout, like the old prints)
+    """
+    global _handler, _settings
+    root = logging.getLogger(ROOT_LOGGER)
+    
+    if _handler is not None:
+        root.removeHandler(_handler)
+    
+    _handler = logging.StreamHandler(stream or sys.stdout)
+    _handler.setFormatter(FORMATTERS[fmt]())
+    root.addHandler(_handler)
+    root.propagate = False
+    
+    root.setLevel(logging.WARNING if quiet else level)
+    logging.getLogger(PROGRESS_LOGGER).setLevel(logging.INFO if quiet else logging.NOTSET)
+    
+    stream_name = {sys.stdout: 'stdout', sys.stderr: 'stderr'}.get(stream or sys.stdout)
+    _settings = {'level': level, 'fmt': fmt, 'quiet': quiet, 'stream_name': stream_name}
+    return root
+
+def logging_settings():
+    """The last configure_logging() arguments as a picklable dict (None if never configured), for worker processes"""
+    return dict(_settings) if _settings is not None else None
+
+def apply_logging_settings(settings):
+    """configure_logging() from logging_settings() in a worker process (no-op for None)"""
+    if settings is None:
+        return
+    stream = getattr(sys, settings['stream_name']) if settings['stream_name'] else None
+    configure_logging(settings['level'], settings['fmt'], settings['quiet'], stream)
+
+def get_logger(name):
+    """Logger for an engine module (silent until configure_logging() or the host app sets up logging)"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+def get_progress_logger():
+    """Logger for progress lines and run summaries - still shown in quiet mode"""
+    return get_logger('progress')
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressReporter:
+    """
+    Batch progress line - rows/sec, ETA and tokens/sec - emitted at most
+    once per interval seconds, so its cost does not grow with row count
+    """
+    
+    def __init__(self, total, token_counter=None, interval=PROGRESS_INTERVAL, logger=None):
+        """
+        Args:
+            total: Rows in the batch
+            token_counter: Callable returning total tokens used so far
+            interval: Minimum seconds between progress lines
+        """
+        self.total = total
+        self.token_counter = token_counter
+        self.interval = interval
+        self.logger = logger or get_progress_logger()
+        
+        self.done = 0
+        self.start = time.perf_counter()
+        self._last_report = self.start
+        self._start_tokens = token_counter() if token_counter else 0
+    
+    def update(self, rows=1):
+        self.done += rows
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self._report(now)
+    
+    def finish(self):
+        self._report(time.perf_counter())
+    
+    def _report(self, now):
+        elapsed = now - self.start
+        rate = self.done / elapsed if elapsed else 0.0
+        eta = (self.total - self.done) / rate if rate else 0.0
+        tokens = (self.token_counter() - self._start_tokens) if self.token_counter else 0
+        tokens_rate = tokens / elapsed if elapsed else 0.0
+        
+        self.logger.info(
+            "📈 %d/%d rows | %.1f rows/sec | ETA %s | %.0f tokens/sec",
+            self.done, self.total, rate, _format_duration(eta), tokens_rate,
+            extra={'fields': {
+                'event': 'progress',
+                'rows_done': self.done,
+                'rows_total': self.total,
+                'rows_per_sec': round(rate, 3),
+                'eta_s': round(eta, 1),
+                'tokens_per_sec': round(tokens_rate, 1)
+            }}
+        )
\ No newline at end of file
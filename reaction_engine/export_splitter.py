@@ -0,0 +1,109 @@
+"""
+Single-pass splitter for the combined career export.
+
+COMBINED_EXPORT.csv holds every exported sheet one after another, each
+introduced by a "=== SHEET: Name ===" line. split_combined_export reads
+it once with csv.reader, so quoted fields may span lines. Each sheet's
+rows go straight to <output_dir>/<name>.csv as they are read, and memory
+stays flat however long the export is.
+"""
+import csv
+import os
+from config import COMBINED_EXPORT_CSV, BASE_DIR
+from engine_logging import get_logger
+
+logger = get_logger('export')
+
+SHEET_MARKER = "=== SHEET:"
+
+def sheet_name(marker):
+    """'=== SHEET: Season Stats ===' -> 'Season_Stats'"""
+    return marker.replace('"', '').replace(SHEET_MARKER, "").replace("===", "").strip().replace(" ", "_")
+
+
+class _SheetWriter:
+    """One sheet's CSV; the file is only created once a data row follows the header"""
+    
+    def __init__(self, name, output_dir):
+        self.name = name
+        self.path = os.path.join(output_dir, f"{name.lower()}.csv")
+        self.header = None
+        self.rows = 0
+        self._file = None
+        self._writer = None
+    
+    def write(self, row):
+        if self.header is None:
+            self.header = row
+            return
+        
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8', newline='')
+            self._writer = csv.writer(self._file, lineterminator='\n')
+            self._writer.writerow(self.header)
+        self._writer.writerow(row)
+        self.rows += 1
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def split_combined_export(path=COMBINED_EXPORT_CSV, output_dir=BASE_DIR, build_cache=False):
+    """
+    Split the combined export into one CSV per sheet in a single streaming pass
+    
+    Args:
+        path: Combined export file
+        output_dir: Folder for the per-sheet CSVs (named after the sheet, lowercased)
+        build_cache: Also write each sheet's typed cache (see data_cache.py)
+    
+    Returns:
+        dict: sheet name -> {'path', 'rows', 'columns'} for every sheet written
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info("📖 Splitting %s...", path)
+    
+    written = {}
+    sheet = None
+    
+    def finish(sheet):
+        sheet.close()
+        if not sheet.rows:
+            logger.warning("⚠️  Skipping sheet '%s' - no data rows", sheet.name)
+            return
+        
+        written[sheet.name] = {'path': sheet.path, 'rows': sheet.rows, 'columns': sheet.header}
+        logger.info("✅ Saved %s", sheet.path)
+        logger.info("   📊 %d rows, %d columns", sheet.rows, len(sheet.header))
+        
+        if build_cache:
+            from data_cache import convert
+            convert(sheet.path)
+    
+    # newline='' lets csv.reader keep newlines inside quoted fields
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.reader(f):
+            if not any(field.strip() for field in row):
+                continue  # Blank separator line
+            
+            if SHEET_MARKER in row[0]:
+                if sheet is not None:
+                    finish(sheet)
+                sheet = _SheetWriter(sheet_name(row[0]), output_dir)
+                logger.info("🆕 Found new sheet: %s", sheet.name)
+                continue
+            
+            if sheet is None:
+                continue  # Anything before the first marker
+            
+            # Trim the line ends, as the old line.strip() did, but never inside a field
+            row[0] = row[0].lstrip()
+            row[-1] = row[-1].rstrip()
+            sheet.write(row)
+    
+    if sheet is not None:
+        finish(sheet)
+    
+    logger.info("\n📋 Total sheets written: %d", len(written))
+    return written
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+Watch mode: react to new matches as soon as the Lua scripts export them.
+
+The watcher polls COMBINED_EXPORT.csv (written by scripts/combined.lua
+after each in-game match). When the file's mtime/size change and have
+settled, its content hash is compared with the last one seen. On a real
+change the export is split (export_splitter), the typed cache is
+refreshed (data_cache), and only match rows not yet in the watch journal
+are fed through a fresh ReactionEngine. Reactions are appended to the
+usual output files.
+
+    python export_watcher.py
+"""
+import hashlib
+import os
+import time
+from config import (
+    COMBINED_EXPORT_CSV, BASE_DIR, BIGMATCHUPS_CSV, SEASONSTATS_CSV, PLAYERMATCH_CSV,
+    WATCH_INTERVAL, WATCH_SETTLE, WATCH_JOURNAL, STREAM_FORMATS
+)
+from checkpoint import ReactionJournal, row_keys
+from data_cache import load_table
+from engine_logging import get_logger, get_progress_logger, configure_logging
+from export_splitter import split_combined_export
+from llm_client import LLMClient
+from reaction_engine import ReactionEngine
+
+logger = get_logger('watch')
+progress_logger = get_progress_logger()
+
+TABLES = (
+    ('df_big', BIGMATCHUPS_CSV),
+    ('df_season', SEASONSTATS_CSV),
+    ('df_player', PLAYERMATCH_CSV)
+)
+
+def file_digest(path, chunk_size=1 << 20):
+    """sha256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExportWatcher:
+    """
+    Poll the combined export and process only the matches it has not seen
+    
+    Processed rows are tracked by row key (artificialkey/playerid/date) in
+    a ReactionJournal, so a restart never regenerates a match. One LLMClient
+    (rate limiter, response cache, usage stats) is reused for every cycle.
+    """
+    
+    def __init__(self, export_path=COMBINED_EXPORT_CSV, output_dir=BASE_DIR, journal_path=WATCH_JOURNAL,
+                 interval=WATCH_INTERVAL, settle=WATCH_SETTLE, include_personalities=True,
+                 formats=STREAM_FORMATS, llm=None):
+        self.export_path = export_path
+        self.output_dir = output_dir
+        self.interval = interval
+        self.settle = settle
+        self.include_personalities = include_personalities
+        self.formats = formats
+        
+        self.llm = llm if llm is not None else LLMClient()
+        self.journal = ReactionJournal(journal_path)
+        self.used_personalities = []
+        self.reactions_generated = 0
+        
+        self._last_stat = None
+        self._last_digest = None
+    
+    def _stat(self):
+        try:
+            st = os.stat(self.export_path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    
+    def poll(self):
+        """
+        Check the export once
+        
+        Returns:
+            int: reactions generated (0 if the export did not change)
+        """
+        stat = self._stat()
+        if stat is None or stat == self._last_stat:
+            return 0
+        
+        # Still being written - try again on the next poll
+        time.sleep(self.settle)
+        if self._stat() != stat:
+            return 0
+        
+        digest = file_digest(self.export_path)
+        processed = self.ingest() if digest != self._last_digest else 0  # Same hash = touched, not changed
+        
+        # Only remembered once ingested, so a failed cycle is retried
+        self._last_stat, self._last_digest = stat, digest
+        return processed
+    
+    def ingest(self):
+        """Split the export, refresh the cache and react to the new match rows"""
+        split_combined_export(self.export_path, self.output_dir, build_cache=True)
+        
+        # The splitter names files after the sheets, which the table paths in config follow
+        tables = {
+            name: load_table(os.path.join(self.output_dir, os.path.basename(path)))
+            for name, path in TABLES
+        }
+        
+        df_player = tables['df_player']
+        new_rows = df_player[[key not in self.journal for key in row_keys(df_player)]]
+        if new_rows.empty:
+            progress_logger.info("💤 No new matches in %s", self.export_path)
+            return 0
+        
+        progress_logger.info("🆕 %d new matches (%d already done)", len(new_rows), len(df_player) - len(new_rows))
+        
+        engine = ReactionEngine(**tables, llm=self.llm)
+        engine.personality_reactor.used_personalities = self.used_personalities
+        engine.stream_outputs(self.formats, append=True)
+        try:
+            engine.process_batch(new_rows, include_personalities=self.include_personalities,
+                                 checkpoint=self.journal)
+        finally:
+            engine.close_outputs()
+        
+        self.used_personalities = engine.personality_reactor.used_personalities
+        self.reactions_generated += engine.recorded_count
+        return engine.recorded_count
+    
+    def run(self, max_cycles=None):
+        """Poll every interval seconds until interrupted (or for max_cycles polls)"""
+        progress_logger.info("👀 Watching %s (every %.1fs, %d matches already done)",
+                             self.export_path, self.interval, len(self.journal))
+        
+        cycles = 0
+        try:
+            while max_cycles is None or cycles < max_cycles:
+                try:
+                    self.poll()
+                except Exception as e:
+                    # A half-written or malformed export must not kill the daemon
+                    logger.error("❌ Error ingesting %s: %s", self.export_path, e)
+                cycles += 1
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            progress_logger.info("\n🛑 Watcher stopped")
+        finally:
+            self.journal.close()
+
+
+def main():
+    """Run the watcher on the configured export until Ctrl+C"""
+    configure_logging()
+    ExportWatcher().run()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Local stand-in for the Groq chat completions API, for benchmarking batch
+modes without spending API quota.
+
+Usage:
+    python fake_llm_server.py --port 8765 --latency 0.4
+    then set GROQ_BASE_URL=http://127.0.0.1:8765 before running the engine
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeCompletionHandler(BaseHTTPRequestHandler):
+    """Answers any POST .../chat/completions with a canned reaction"""
+
+    latency = 0.4  # Seconds per request
+    jitter = 0.1   # +/- seconds of random variation
+    rate_limit_rate = 0.0  # Fraction of requests answered with 429
+    protocol_version = 'HTTP/1.1'  # Keep connections open between requests, like the real API
+
+    def do_POST(self):
+        if not self.path.endswith('/chat/completions'):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        prompt = body.get('messages', [{}])[-1].get('content', '')
+
+        if random.random() < self.rate_limit_rate:
+            self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_exceeded'}},
+                            {'Retry-After': '1'})
+            return
+
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+        content = f"[Fake Reaction] {prompt[:60]}..."
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+
+        self._send_json(200, {
+            'id': f"chatcmpl-fake-{time.time_ns()}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'fake'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        })
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+
+def serve(host='127.0.0.1', port=8765, latency=0.4, jitter=0.1, rate_limit_rate=0.0):
+    """Start the fake server (blocks until interrupted)"""
+    FakeCompletionHandler.latency = latency
+    FakeCompletionHandler.jitter = jitter
+    FakeCompletionHandler.rate_limit_rate = rate_limit_rate
+
+    server = ThreadingHTTPServer((host, port), FakeCompletionHandler)
+    print(f"🧪 Fake LLM server on http://{host}:{port} ({latency}s ± {jitter}s per request)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Groq endpoint for benchmarks")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.4)
+    parser.add_argument('--jitter', type=float, default=0.1)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                        help="Fraction of requests to reject with 429")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.latency, args.jitter, args.rate_limit_rate)
\ No newline at end of file
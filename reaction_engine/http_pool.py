@@ -0,0 +1,118 @@
+"""
+Keep-alive HTTP connection pool for the Groq backend.
+
+One httpx.Client per LLMClient, sized to its in-flight request limit, so
+concurrent rows reuse warm connections instead of paying a TCP + TLS
+handshake per request. httpx.Client is thread-safe: the sync path, the
+personality panel threads and the async batch executor all share it.
+
+Every request carries an httpcore trace hook that records:
+    http_pool_wait   time queued for a free connection (pool saturation)
+    http_connect     time opening a new connection (TCP + TLS)
+as Instrumentation stages, plus counts of requests and new connections.
+"""
+import threading
+import time
+from config import (
+    HTTP_MAX_CONNECTIONS, HTTP_KEEPALIVE_EXPIRY, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT,
+    HTTP_POOL_TIMEOUT, MAX_CONCURRENT_REQUESTS
+)
+from instrumentation import Instrumentation
+
+class HTTPPool:
+    """Lazily opened, explicitly sized httpx.Client with pool metrics"""
+    
+    def __init__(self, max_connections=HTTP_MAX_CONNECTIONS, metrics=None):
+        # None = sized by reserve() (LLMClient passes its max in-flight requests)
+        self.fixed_size = max_connections is not None
+        self.max_connections = max_connections or MAX_CONCURRENT_REQUESTS
+        self.metrics = metrics if metrics is not None else Instrumentation()
+        
+        self.requests = 0
+        self.connections_opened = 0
+        
+        self._client = None
+        self._lock = threading.Lock()
+    
+    @property
+    def opened(self):
+        return self._client is not None
+    
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._open()
+        return self._client
+    
+    def reserve(self, connections):
+        """Grow the pool to cover this many concurrent requests (only before it is opened)"""
+        if not self.fixed_size and not self.opened:
+            self.max_connections = max(self.max_connections, connections)
+    
+    def _open(self):
+        import httpx
+        
+        return httpx.Client(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,  # Never close a connection a waiting request could use
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT, pool=HTTP_POOL_TIMEOUT),
+            follow_redirects=True,
+            event_hooks={'request': [self._trace_request]}
+        )
+    
+    def _trace_request(self, request):
+        """httpx request hook: attach an httpcore trace callback timing this request's pool wait and connect"""
+        queued = time.perf_counter()
+        state = {'waiting': True, 'connecting': None}
+        
+        with self._lock:
+            self.requests += 1
+        
+        def trace(event, info):
+            if not event.endswith('.started'):
+                return
+            now = time.perf_counter()
+            
+            # The first thing a request does once it holds a connection: connect it, or send on it
+            if state['waiting']:
+                state['waiting'] = False
+                self.metrics.observe('http_pool_wait', now - queued)
+            
+            if event == 'connection.connect_tcp.started':
+                state['connecting'] = now
+                with self._lock:
+                    self.connections_opened += 1
+            elif event.endswith('send_request_headers.started') and state['connecting'] is not None:
+                self.metrics.observe('http_connect', now - state['connecting'])
+                state['connecting'] = None
+        
+        request.extensions['trace'] = trace
+    
+    def stats(self):
+        """Request/connection counts and pool wait, for LLMClient.get_stats"""
+        with self._lock:
+            requests, opened = self.requests, self.connections_opened
+        
+        stages = self.metrics.snapshot()
+        wait = stages.get('http_pool_wait', {})
+        connect = stages.get('http_connect', {})
+        return {
+            'http_max_connections': self.max_connections,
+            'http_requests': requests,
+            'http_connections_opened': opened,
+            'http_connection_reuse_rate': round(1 - opened / requests, 3) if requests else 0.0,
+            'http_pool_wait_seconds': round(wait.get('total_s', 0.0), 3),
+            'http_pool_wait_p95_ms': round(wait.get('p95_ms', 0.0), 2),
+            'http_connect_seconds': round(connect.get('total_s', 0.0), 3)
+        }
+    
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
@@ -0,0 +1,187 @@
+"""
+Per-stage timing for the reaction pipeline.
+
+Spans (context tags, narrative, prompt build, LLM queue/rate-limit/network time,
+personality package, whole row) feed fixed-bucket histograms that can be
+exported as JSON or Prometheus text at the end of a run. Optionally one
+row in every N is captured with cProfile.
+"""
+import contextlib
+import cProfile
+import json
+import os
+import threading
+import time
+from config import ENABLE_INSTRUMENTATION, PROFILE_EVERY_N_ROWS, PROFILE_DIR
+from engine_logging import get_progress_logger
+
+logger = get_progress_logger()
+
+# Histogram bucket upper bounds, seconds
+BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float('inf'))
+
+class Histogram:
+    """Fixed-bucket latency histogram (constant memory however long the run)"""
+    
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+    
+    def merge(self, other):
+        """Add another histogram's observations to this one"""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+    
+    def quantile(self, q):
+        """Estimate from the buckets, interpolating within the one holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(BUCKETS, self.counts):
+            if count and seen + count >= rank:
+                upper = min(bound, self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.max
+    
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_s': self.total,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'p50_ms': self.quantile(0.50) * 1000,
+            'p95_ms': self.quantile(0.95) * 1000,
+            'max_ms': self.max * 1000
+        }
+
+
+class Instrumentation:
+    """Thread-safe collection of per-stage histograms plus optional per-row profiling"""
+    
+    def __init__(self, enabled=ENABLE_INSTRUMENTATION, profile_every=PROFILE_EVERY_N_ROWS,
+                 profile_dir=PROFILE_DIR):
+        self.enabled = enabled
+        self.profile_every = profile_every
+        self.profile_dir = profile_dir
+        self.histograms = {}
+        self._lock = threading.Lock()
+    
+    @contextlib.contextmanager
+    def span(self, stage):
+        """Time the enclosed block as one observation of stage"""
+        if not self.enabled:
+            yield
+            return
+        
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+    
+    def observe(self, stage, seconds):
+        """Record an already-measured duration"""
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+    
+    @contextlib.contextmanager
+    def profile(self, row_idx):
+        """cProfile the enclosed block when row_idx is a multiple of profile_every"""
+        if not (self.enabled and self.profile_every and row_idx % self.profile_every == 0):
+            yield
+            return
+        
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.profile_dir, f"row_{row_idx}.prof"))
+    
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+    
+    def snapshot(self):
+        """stage -> count, total, mean/p50/p95/max ms"""
+        with self._lock:
+            return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+    
+    def export_json(self, path):
+        """Write the summary plus raw bucket counts"""
+        with self._lock:
+            data = {
+                'buckets': [str(bound) for bound in BUCKETS],
+                'stages': {
+                    stage: dict(histogram.summary(), bucket_counts=histogram.counts)
+                    for stage, histogram in self.histograms.items()
+                }
+            }
+        
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        logger.info("📄 Saved metrics: %s", path)
+    
+    def prometheus_text(self):
+        """Histograms in Prometheus text exposition format"""
+        lines = [
+            "# HELP reaction_engine_stage_seconds Wall time per reaction pipeline stage",
+            "# TYPE reaction_engine_stage_seconds histogram"
+        ]
+        
+        with self._lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float('inf') else repr(bound)
+                    lines.append(f'reaction_engine_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'reaction_engine_stage_seconds_sum{{stage="{stage}"}} {histogram.total}')
+                lines.append(f'reaction_engine_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+        
+        return "\n".join(lines) + "\n"
+    
+    def export_prometheus(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        logger.info("📄 Saved Prometheus metrics: %s", path)
+    
+    def print_summary(self):
+        """Per-stage table, slowest total first"""
+        stats = self.snapshot()
+        if not stats:
+            return
+        
+        logger.info("\n⏱️ Stage Timings:", extra={'fields': {'event': 'stage_timings', 'stages': stats}})
+        for stage, s in sorted(stats.items(), key=lambda item: -item[1]['total_s']):
+            logger.info("   %-22s n=%-7d total %8.2fs | mean %8.2f ms | p50 %8.2f ms | p95 %8.2f ms | max %8.2f ms",
+                        stage, s['count'], s['total_s'], s['mean_ms'], s['p50_ms'], s['p95_ms'], s['max_ms'])
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Completion backends for LLMClient.
+
+A backend turns one chat request into a Completion (text + token usage).
+GroqBackend talks to the real API; MockBackend is a deterministic local
+stand-in with configurable latency, errors and token counts, for offline
+runs and benchmarks.
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+from types import SimpleNamespace
+from config import (
+    GROQ_API_KEY, GROQ_BASE_URL, LLM_BACKEND, MOCK_LLM_LATENCY, MOCK_LLM_JITTER,
+    MOCK_LLM_ERROR_RATE, MOCK_LLM_RATE_LIMIT_RATE, MOCK_LLM_COMPLETION_TOKENS
+)
+
+Usage = namedtuple('Usage', ['prompt_tokens', 'completion_tokens', 'total_tokens'])
+Completion = namedtuple('Completion', ['text', 'usage'])
+
+# Keys of the JSON object a structured prompt asks for: {"key": "...", ...}
+JSON_KEY_PATTERN = re.compile(r'"(\w+)": "\.\.\."')
+
+class GroqBackend:
+    """Groq chat completions over a keep-alive connection pool (see http_pool)"""
+    
+    name = 'groq'
+    uses_http_pool = True
+    
+    def __init__(self, api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL, http_pool=None):
+        from groq import Groq
+        from http_pool import HTTPPool
+        
+        self.http_pool = http_pool if http_pool is not None else HTTPPool()
+        http_client = self.http_pool.client
+        
+        # Retries are LLMClient's (rate limiter + backoff), not the SDK's
+        self.client = Groq(api_key=api_key, base_url=base_url, max_retries=0,
+                           http_client=http_client, timeout=http_client.timeout)
+    
+    def complete(self, model, messages, temperature, max_tokens, top_p, response_format=None):
+        extra = {'response_format': response_format} if response_format else {}
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=top_p,
+            **extra
+        )
+        
+        usage = response.usage
+        return Completion(
+            response.choices[0].message.content,
+            Usage(usage.prompt_tokens, usage.completion_tokens, usage.total_tokens)
+        )
+
+
+class MockAPIError(Exception):
+    """Injected failure, shaped like the SDK's status errors (status_code, response.headers)"""
+    
+    def __init__(self, message, status_code, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        headers = {'retry-after': str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(headers=headers)
+
+
+class MockBackend:
+    """
+    Deterministic local backend
+    
+    Every outcome (latency jitter, injected error, token count) is drawn
+    from an RNG seeded by the prompt, its sampling params and how many times
+    that prompt has been tried, so a run is reproducible no matter how
+    requests interleave across threads.
+    """
+    
+    name = 'mock'
+    uses_http_pool = False
+    
+    def __init__(self, latency=MOCK_LLM_LATENCY, jitter=MOCK_LLM_JITTER, error_rate=MOCK_LLM_ERROR_RATE,
+                 rate_limit_rate=MOCK_LLM_RATE_LIMIT_RATE, completion_tokens=MOCK_LLM_COMPLETION_TOKENS,
+                 retry_after=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.completion_tokens = completion_tokens
+        self.retry_after = retry_after
+        self.seed = seed
+        
+        self.calls = 0
+        self._attempts = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def render(prompt, response_format=None):
+        """Mock completion text; JSON mode fills every key the prompt asks for"""
+        if response_format:
+            keys = JSON_KEY_PATTERN.findall(prompt) or ['reaction']
+            return json.dumps({key: f"[Mock {key}] {prompt[:60]}..." for key in keys})
+        return f"[Mock Reaction] {prompt[:80]}..."
+    
+    def complete(self, model, messages, temperature, max_tokens, top_p, response_format=None):
+        prompt = messages[-1]['content']
+        request_id = hash((model, temperature, max_tokens, top_p, prompt))
+        
+        # Only prompts waiting on a 429 retry are remembered
+        with self._lock:
+            self.calls += 1
+            attempt = self._attempts.pop(request_id, 0)
+        
+        rng = random.Random(f"{self.seed}|{attempt}|{model}|{temperature}|{max_tokens}|{top_p}|{prompt}")
+        
+        delay = self.latency + rng.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            with self._lock:
+                self._attempts[request_id] = attempt + 1
+            raise MockAPIError("Mock rate limit", 429, retry_after=self.retry_after)
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise MockAPIError("Mock server error", 500)
+        
+        text = self.render(prompt, response_format)
+        
+        prompt_tokens = sum(len(m['content']) for m in messages) // 4
+        completion_tokens = min(max_tokens, max(1, int(self.completion_tokens * rng.uniform(0.5, 1.5))))
+        return Completion(text, Usage(prompt_tokens, completion_tokens, prompt_tokens + completion_tokens))
+
+
+BACKENDS = {
+    'groq': GroqBackend,
+    'mock': MockBackend
+}
+
+def make_backend(name=LLM_BACKEND, http_pool=None, **kwargs):
+    """Build a backend by name ('groq' or 'mock'); http_pool goes to backends that talk HTTP"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name} (expected one of {', '.join(BACKENDS)})")
+    
+    backend_class = BACKENDS[name]
+    if http_pool is not None and backend_class.uses_http_pool:
+        kwargs['http_pool'] = http_pool
+    return backend_class(**kwargs)
\ No newline at end of file
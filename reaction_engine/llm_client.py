@@ -1,90 +1,401 @@
+import asyncio
 import json
+import sqlite3
+import threading
 import time
-from groq import Groq
-from reaction_engine.config import GROQ_API_KEY, GROQ_MODEL, MAX_TOKENS, TEMPERATURE, TOP_P
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    GROQ_MODEL, MAX_TOKENS, TEMPERATURE, TOP_P,
+    MAX_CONCURRENT_REQUESTS, MAX_RATE_LIMIT_RETRIES, ENABLE_RESPONSE_CACHE,
+    MULTI_TONE_SINGLE_REQUEST, MULTI_TONE_MAX_TOKENS, HTTP_MAX_CONNECTIONS
+)
+from engine_logging import get_logger
+from http_pool import HTTPPool
+from instrumentation import Instrumentation
+from llm_backends import make_backend
+from rate_limiter import get_shared_limiter, backoff_delay
+from response_cache import ResponseCache
+from usage import UsageStats
+
+# (tone key, instruction appended to the base prompt, temperature)
+TONE_STYLES = [
+    # 1. Commentator Style (High energy, 0.9 temp)
+    ('commentator', "Generate a COMMENTATOR-STYLE reaction: High energy, broadcast tone, emotional, like you're calling the match live. 2-3 sentences max.", 0.9),
+    # 2. Journalist Style (Formal, 0.7 temp)
+    ('journalist', "Generate a JOURNALIST-STYLE match report: Professional, analytical, balanced tone. Include a headline and 3-4 sentences.", 0.7),
+    # 3. Fan Tweet Style (Emotional, 0.95 temp)
+    ('fan_tweet', "Generate a FAN TWEET reaction: Emotional, short (under 280 chars), uses caps for emphasis, maybe an emoji. Raw fan emotion!", 0.95),
+]
+
+MULTI_TONE_INSTRUCTIONS = """Write THREE different reactions to this performance and return them as a JSON object with exactly these keys:
+{{"commentator": "...", "journalist": "...", "fan_tweet": "..."}}
+
+{tone_lines}
+
+Each reaction must read as if written by a different person. Return ONLY the JSON object, no other text."""
+
+# Rendered once - only the base prompt changes per row
+MULTI_TONE_SUFFIX = MULTI_TONE_INSTRUCTIONS.format(
+    tone_lines="\n".join(f"- {tone}: {instruction}" for tone, instruction, _ in TONE_STYLES)
+)
+
+logger = get_logger('llm')
+
+SYSTEM_MESSAGE = "You are an expert football journalist and commentator. Generate authentic, varied, and emotionally resonant match reactions. Never repeat phrases. Be creative and natural."
 
 class LLMClient:
-    """Handles all LLM interactions with Groq"""
+    """Handles all LLM interactions (Groq by default, see llm_backends)"""
     
-    def __init__(self):
-        self.client = Groq(api_key=GROQ_API_KEY)
+    def __init__(self, rate_limiter=None, cache=None, use_cache=ENABLE_RESPONSE_CACHE, backend=None,
+                 metrics=None):
+        # Completion provider: GroqBackend, or MockBackend for offline runs (LLM_BACKEND).
+        # Built on the first request, so engines that never call the API never import the SDK
+        self._backend = backend
+        self._lazy_lock = threading.Lock()
         self.model = GROQ_MODEL
-        self.request_count = 0
-        self.total_tokens = 0
         
-    def generate_reaction(self, prompt, temperature=None):
+        # Tokens, calls, retries, fallbacks and latency - per thread, merged on read (see usage.py)
+        self.usage = UsageStats()
+        
+        # Shared RPM/TPM budget across every client in the process
+        self.rate_limiter = rate_limiter or get_shared_limiter()
+        
+        # On-disk response cache (opened on first use); set bypass_cache for fresh variety on a re-run
+        self._cache = cache
+        self.use_cache = use_cache or cache is not None
+        self.bypass_cache = False
+        
+        # Ask for all three tones in one request (see generate_multi_tone_reactions)
+        self.multi_tone_single_request = MULTI_TONE_SINGLE_REQUEST
+        
+        # Stage timings: llm_queue (async slot/thread wait), llm_rate_limit, llm_network (provider call)
+        self.metrics = metrics if metrics is not None else Instrumentation()
+        
+        # Async batch mode: blocking SDK calls run on a bounded thread pool
+        self.max_in_flight = MAX_CONCURRENT_REQUESTS
+        self._semaphore = None
+        self._executor = None
+        
+        # Keep-alive connections shared by every thread and task using this client
+        # (sized to max_in_flight unless HTTP_MAX_CONNECTIONS is set; opened with the backend)
+        self.http_pool = HTTPPool(HTTP_MAX_CONNECTIONS, metrics=self.metrics)
+    
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._lazy_lock:
+                if self._backend is None:
+                    self.http_pool.reserve(self.max_in_flight)
+                    self._backend = make_backend(http_pool=self.http_pool)
+        return self._backend
+    
+    @property
+    def request_count(self):
+        return self.usage.total('requests')
+    
+    @property
+    def total_tokens(self):
+        return self.usage.total('total_tokens')
+    
+    @property
+    def cache(self):
+        if self._cache is None and self.use_cache:
+            with self._lazy_lock:
+                if self._cache is None:
+                    self._cache = ResponseCache()
+        return self._cache
+    
+    def generate_reaction(self, prompt, temperature=None, bypass_cache=False, max_tokens=None,
+                          json_mode=False, mode='single', label=None, cache_scope=None):
         """
-        Generate a single reaction using Groq LLM
+        Generate a single reaction using the configured backend
         
         Args:
             prompt (str): The formatted prompt
             temperature (float): Override default temperature
-            
+            bypass_cache (bool): Skip the response cache lookup for this call
+            max_tokens (int): Override MAX_TOKENS
+            json_mode (bool): Ask the provider for a JSON object response
+            mode (str): Label for the per-mode token usage stats
+            label (str): Tone or personality this call is for ('tone/...', 'personality/...')
+            cache_scope (str): Row key the response belongs to - cached responses
+                               are only reused for the same row
+        
         Returns:
             str: Generated reaction text
         """
-        try:
-            temp = temperature if temperature is not None else TEMPERATURE
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert football journalist and commentator. Generate authentic, varied, and emotionally resonant match reactions. Never repeat phrases. Be creative and natural."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=temp,
-                max_tokens=MAX_TOKENS,
-                top_p=TOP_P
+        temp = temperature if temperature is not None else TEMPERATURE
+        max_tokens = max_tokens or MAX_TOKENS
+        response_format = {"type": "json_object"} if json_mode else None
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ResponseCache.make_key(
+                self.model, SYSTEM_MESSAGE, prompt, temp, max_tokens, TOP_P, response_format, cache_scope
             )
+            if not (bypass_cache or self.bypass_cache):
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    return cached
+        messages = [
+            {
+                "role": "system",
+                "content": SYSTEM_MESSAGE
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+        
+        # Rough budget estimate (~4 chars/token) until the real usage comes back
+        estimated_tokens = (len(SYSTEM_MESSAGE) + len(prompt)) // 4 + max_tokens
+        
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            self.metrics.observe('llm_rate_limit', self.rate_limiter.acquire(estimated_tokens))
             
-            self.request_count += 1
-            self.total_tokens += response.usage.total_tokens
-            
-            return response.choices[0].message.content.strip()
+            try:
+                start = time.perf_counter()
+                try:
+                    response = self.backend.complete(
+                        self.model, messages, temp, max_tokens, TOP_P, response_format
+                    )
+                finally:
+                    latency = time.perf_counter() - start
+                    self.metrics.observe('llm_network', latency)
+                
+                self.usage.record_request(mode, response.usage, latency, label)
+                self.rate_limiter.reconcile(estimated_tokens, response.usage.total_tokens)
+                
+                text = response.text.strip()
+                break
             
-        except Exception as e:
-            print(f"❌ LLM Error: {e}")
-            return self._fallback_reaction()
+            except Exception as e:
+                if self._is_rate_limited(e) and attempt < MAX_RATE_LIMIT_RETRIES:
+                    delay = backoff_delay(attempt, self._retry_after(e))
+                    self.usage.add('retries')
+                    logger.warning("⏳ Rate limited, retrying in %.1fs (attempt %d/%d)",
+                                   delay, attempt + 1, MAX_RATE_LIMIT_RETRIES)
+                    self.rate_limiter.pause(delay)
+                    continue
+                
+                logger.error("❌ LLM Error: %s", e)
+                self.usage.add('fallbacks')
+                return self._fallback_reaction()
+        
+        # Fresh responses are stored even when bypassing, so the next
+        # cached run picks up the newest variant
+        if cache_key is not None:
+            self._cache_put(cache_key, text, response.usage.total_tokens)
+        
+        return text
+    
+    def _cache_get(self, key):
+        """Cached response text, or None on a miss or a cache error (the call goes to the API)"""
+        try:
+            return self.cache.get(key)
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Response cache lookup failed (%s) - calling the API", e)
+            return None
+    
+    def _cache_put(self, key, text, tokens):
+        """Store a response; a cache error (e.g. locked by another shard) never costs the paid response"""
+        try:
+            self.cache.put(key, text, tokens)
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Response cache write failed (%s) - response not cached", e)
+    
+    @staticmethod
+    def _is_rate_limited(error):
+        """True for HTTP 429 responses"""
+        return getattr(error, 'status_code', None) == 429
+    
+    @staticmethod
+    def _retry_after(error):
+        """Seconds from the Retry-After header, if the provider sent one"""
+        response = getattr(error, 'response', None)
+        if response is None:
+            return None
+        try:
+            return float(response.headers.get('retry-after'))
+        except (TypeError, ValueError):
+            return None
+    
+    def count_mode_row(self, mode):
+        """Count one finished row against a generation mode"""
+        self.usage.add(f'mode/{mode}/rows')
+    
+    def count_unusable(self, mode):
+        """Count a structured response that would not parse (the row falls back to separate calls)"""
+        self.usage.add(f'mode/{mode}/unusable')
+    
+    def count_row(self):
+        """Count one finished output row, for tokens and requests per row"""
+        self.usage.add('rows')
+    
+    @staticmethod
+    def build_multi_tone_prompt(base_prompt):
+        """Single prompt asking for every tone as one JSON object"""
+        return f"{base_prompt}\n\n{MULTI_TONE_SUFFIX}"
     
-    def generate_multi_tone_reactions(self, base_prompt, player_name):
+    @staticmethod
+    def parse_json_reactions(text, keys):
+        """
+        Validate a structured (JSON object) multi-reaction response
+        
+        Args:
+            text (str): Raw completion, optionally wrapped in a code fence
+            keys: Keys that must all be present as non-empty strings
+        
+        Returns:
+            dict: key -> reaction text, or None if the response is unusable
+        """
+        text = text.strip()
+        if text.startswith("```"):
+            text = text.strip("`")
+            text = text[text.find("{"):]
+        
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return None
+        
+        if not isinstance(data, dict):
+            return None
+        
+        reactions = {}
+        for key in keys:
+            value = data.get(key)
+            if not isinstance(value, str) or not value.strip():
+                return None
+            reactions[key] = value.strip()
+        return reactions
+    
+    @classmethod
+    def parse_multi_tone_response(cls, text):
+        """Combined-tone response -> {commentator, journalist, fan_tweet}, or None"""
+        return cls.parse_json_reactions(text, [tone for tone, _, _ in TONE_STYLES])
+    
+    def generate_multi_tone_reactions(self, base_prompt, player_name, single_request=None, cache_scope=None):
         """
         Generate reactions in 3 different tones for the same match
         
+        Args:
+            single_request: Ask for all tones in one JSON request, paying for
+                            base_prompt once (defaults to multi_tone_single_request).
+                            Falls back to per-tone calls if the response won't parse.
+            cache_scope: Row key for the response cache (see generate_reaction)
+        
         Returns:
             dict: {commentator, journalist, fan_tweet}
         """
-        reactions = {}
+        if single_request is None:
+            single_request = self.multi_tone_single_request
         
-        # 1. Commentator Style (High energy, 0.9 temp)
-        commentator_prompt = f"{base_prompt}\n\nGenerate a COMMENTATOR-STYLE reaction: High energy, broadcast tone, emotional, like you're calling the match live. 2-3 sentences max."
-        reactions['commentator'] = self.generate_reaction(commentator_prompt, temperature=0.9)
-        time.sleep(0.3)  # Rate limit friendly
+        if single_request:
+            reactions = self.parse_multi_tone_response(self.generate_reaction(
+                self.build_multi_tone_prompt(base_prompt), max_tokens=MULTI_TONE_MAX_TOKENS,
+                json_mode=True, mode='tones_combined', cache_scope=cache_scope
+            ))
+            if reactions is not None:
+                self.count_mode_row('tones_combined')
+                return reactions
+            self.count_unusable('tones_combined')
+            logger.warning("⚠️ Combined tone response unusable - falling back to per-tone calls")
         
-        # 2. Journalist Style (Formal, 0.7 temp)
-        journalist_prompt = f"{base_prompt}\n\nGenerate a JOURNALIST-STYLE match report: Professional, analytical, balanced tone. Include a headline and 3-4 sentences."
-        reactions['journalist'] = self.generate_reaction(journalist_prompt, temperature=0.7)
-        time.sleep(0.3)
+        reactions = {}
         
-        # 3. Fan Tweet Style (Emotional, 0.95 temp)
-        fan_prompt = f"{base_prompt}\n\nGenerate a FAN TWEET reaction: Emotional, short (under 280 chars), uses caps for emphasis, maybe an emoji. Raw fan emotion!"
-        reactions['fan_tweet'] = self.generate_reaction(fan_prompt, temperature=0.95)
+        # Pacing comes from the shared rate limiter
+        for tone, instruction, temp in TONE_STYLES:
+            reactions[tone] = self.generate_reaction(
+                f"{base_prompt}\n\n{instruction}", temperature=temp, mode='tones_split', label=f'tone/{tone}',
+                cache_scope=cache_scope
+            )
         
+        self.count_mode_row('tones_split')
         return reactions
     
+    def configure_concurrency(self, max_in_flight):
+        """
+        Size the async request pool.
+        
+        Call from inside the running event loop before a batch - the
+        semaphore must belong to the loop that awaits it.
+        """
+        self.max_in_flight = max_in_flight
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.http_pool.reserve(max_in_flight)
+        if self.http_pool.opened and max_in_flight > self.http_pool.max_connections:
+            logger.warning("⚠️ %d requests in flight share %d pooled connections - expect pool waits",
+                           max_in_flight, self.http_pool.max_connections)
+        
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm")
+    
+    async def agenerate_reaction(self, prompt, temperature=None, **kwargs):
+        """Async variant of generate_reaction, bounded by max_in_flight"""
+        if self._semaphore is None:
+            self.configure_concurrency(self.max_in_flight)
+        
+        submitted = time.perf_counter()
+        
+        def run():
+            # Time spent waiting for a semaphore slot and a pool thread
+            self.metrics.observe('llm_queue', time.perf_counter() - submitted)
+            return self.generate_reaction(prompt, temperature, **kwargs)
+        
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, run)
+    
+    async def agenerate_multi_tone_reactions(self, base_prompt, player_name, single_request=None, cache_scope=None):
+        """Async variant of generate_multi_tone_reactions - per-tone calls run in flight at once"""
+        if single_request is None:
+            single_request = self.multi_tone_single_request
+        
+        if single_request:
+            reactions = self.parse_multi_tone_response(await self.agenerate_reaction(
+                self.build_multi_tone_prompt(base_prompt), max_tokens=MULTI_TONE_MAX_TOKENS,
+                json_mode=True, mode='tones_combined', cache_scope=cache_scope
+            ))
+            if reactions is not None:
+                self.count_mode_row('tones_combined')
+                return reactions
+            self.count_unusable('tones_combined')
+            logger.warning("⚠️ Combined tone response unusable - falling back to per-tone calls")
+        
+        texts = await asyncio.gather(*[
+            self.agenerate_reaction(f"{base_prompt}\n\n{instruction}", temperature=temp, mode='tones_split',
+                                    label=f'tone/{tone}', cache_scope=cache_scope)
+            for tone, instruction, temp in TONE_STYLES
+        ])
+        self.count_mode_row('tones_split')
+        return {tone: text for (tone, _, _), text in zip(TONE_STYLES, texts)}
+    
+    def close(self):
+        """Close the pooled HTTP connections (reopened on the next request)"""
+        self.http_pool.close()
+    
     def _fallback_reaction(self):
         """Fallback if LLM fails"""
         return "[Error generating reaction - check API key and connection]"
     
     def get_stats(self):
-        """Return usage statistics"""
-        return {
-            'requests': self.request_count,
-            'total_tokens': self.total_tokens,
-            'avg_tokens_per_request': self.total_tokens / max(self.request_count, 1)
-        }
\ No newline at end of file
+        """
+        Return usage statistics
+        
+        Token and call counts, per-mode/tone/personality breakdowns, latency
+        percentiles and per-row cost come from usage.usage_report; for a
+        multi-process total merge each worker's usage.snapshot() instead.
+        """
+        stats = self.usage.report()
+        stats['rate_limit_wait_seconds'] = round(self.rate_limiter.total_wait, 2)
+        
+        if self._cache is not None:
+            stats.update(self._cache.stats())
+        
+        if self.http_pool.opened:
+            stats.update(self.http_pool.stats())
+        
+        return stats
\ No newline at end of file
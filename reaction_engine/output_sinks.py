@@ -0,0 +1,225 @@
+"""
+Streaming output writers - each finished reaction is rendered and written
+as soon as it is recorded, with a small bounded buffer, so memory stays
+flat no matter how long the run is.
+"""
+import csv
+import io
+import json
+import os
+from config import OUTPUT_BUFFER_SIZE
+from engine_logging import get_progress_logger
+
+logger = get_progress_logger()
+
+CSV_FIELDS = ['player', 'team', 'opponent', 'goals', 'rating', 'minutes',
+              'commentator', 'journalist', 'fan_tweet']
+
+def _json_default(value):
+    if hasattr(value, 'item'):
+        return value.item()  # numpy scalar
+    return str(value)
+
+def format_reaction_text(entry):
+    """Standard-tones block for reactions.txt"""
+    parts = [
+        f"\n{'='*80}\n",
+        f"PLAYER: {entry['player']} ({entry['team']} vs {entry['opponent']})\n",
+        f"Stats: {entry['goals']} goals | {entry['rating']} rating | {entry['minutes']} mins\n",
+        f"{'='*80}\n\n"
+    ]
+    
+    if 'commentator' in entry:
+        parts.append(f"🎙️ COMMENTATOR:\n{entry['commentator']}\n\n")
+    
+    if 'journalist' in entry:
+        parts.append(f"📰 JOURNALIST:\n{entry['journalist']}\n\n")
+    
+    if 'fan_tweet' in entry:
+        parts.append(f"💬 FAN TWEET:\n{entry['fan_tweet']}\n\n")
+    
+    return ''.join(parts)
+
+def format_personality_text(entry):
+    """Pundit/manager/player block for personality_reactions.txt (None if absent)"""
+    if 'personality_reactions' not in entry:
+        return None
+    
+    parts = [
+        f"\n{'#'*80}\n",
+        f"MATCH: {entry['player']} - {entry['team']} vs {entry['opponent']}\n",
+        f"Performance: {entry['goals']} goals, {entry['rating']} rating\n",
+        f"{'#'*80}\n\n"
+    ]
+    
+    pr = entry['personality_reactions']
+    
+    # Pundit panel
+    parts.append("🎙️ PUNDIT PANEL:\n")
+    parts.append("-" * 80 + "\n")
+    for pundit, reaction in pr['pundits'].items():
+        parts.append(f"\n{pundit.upper()}:\n\"{reaction}\"\n")
+    
+    # Manager reaction
+    if 'manager' in pr:
+        parts.append(f"\n{'='*80}\n")
+        parts.append(f"⚽ MANAGER'S VIEW ({pr['manager']['manager']}):\n")
+        parts.append(f"\"{pr['manager']['reaction']}\"\n")
+    
+    # Player reaction
+    if 'player' in pr:
+        parts.append(f"\n{'='*80}\n")
+        parts.append(f"👤 PLAYER REACTION ({pr['player']['reactor']} - {pr['player']['relationship']}):\n")
+        parts.append(f"\"{pr['player']['reaction']}\"\n")
+    
+    parts.append("\n\n")
+    return ''.join(parts)
+
+def csv_row(entry):
+    """Flat CSV record (no nested personality data)"""
+    return {
+        'player': entry['player'],
+        'team': entry['team'],
+        'opponent': entry['opponent'],
+        'goals': entry['goals'],
+        'rating': entry['rating'],
+        'minutes': entry['minutes'],
+        'commentator': entry.get('commentator', ''),
+        'journalist': entry.get('journalist', ''),
+        'fan_tweet': entry.get('fan_tweet', '')
+    }
+
+
+class ReactionSink:
+    """
+    Base streaming writer: renders entries and flushes every buffer_size entries
+    
+    With append, entries are added to an existing file (the header is only
+    written if the file is new or empty)
+    """
+    
+    label = "Output"
+    newline = None  # Platform line endings, like the old text outputs
+    
+    def __init__(self, path, buffer_size=OUTPUT_BUFFER_SIZE, append=False):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._buffer = []
+        
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        has_content = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8', newline=self.newline)
+        
+        header = self.header()
+        if header and not has_content:
+            self._file.write(header)
+    
+    def header(self):
+        return None
+    
+    def render(self, entry):
+        raise NotImplementedError
+    
+    def write(self, entry):
+        chunk = self.render(entry)
+        if chunk is None:
+            return
+        
+        self._buffer.append(chunk)
+        self.count += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+    
+    def flush(self):
+        if self._buffer:
+            self._file.write(''.join(self._buffer))
+            self._buffer.clear()
+        self._file.flush()
+    
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+            logger.info("📄 Saved %s: %s", self.label, self.path)
+
+
+class JsonlSink(ReactionSink):
+    """One JSON object per line - the complete record, streamable"""
+    
+    label = "JSONL"
+    
+    def render(self, entry):
+        return json.dumps(entry, ensure_ascii=False, default=_json_default) + '\n'
+
+
+class TextSink(ReactionSink):
+    """Standard tones, human readable"""
+    
+    label = "TXT"
+    
+    def render(self, entry):
+        return format_reaction_text(entry)
+
+
+class PersonalityTextSink(ReactionSink):
+    """Pundit panel / manager / player reactions, human readable"""
+    
+    label = "Personalities"
+    
+    def render(self, entry):
+        return format_personality_text(entry)
+
+
+class CsvSink(ReactionSink):
+    """Flat spreadsheet export"""
+    
+    label = "CSV"
+    newline = ''  # csv module writes its own line terminators
+    
+    def _line(self, values):
+        out = io.StringIO()
+        csv.writer(out, lineterminator=os.linesep).writerow(values)
+        return out.getvalue()
+    
+    def header(self):
+        return self._line(CSV_FIELDS)
+    
+    def render(self, entry):
+        row = csv_row(entry)
+        return self._line([row[field] for field in CSV_FIELDS])
+
+
+SINK_TYPES = {
+    'jsonl': JsonlSink,
+    'txt': TextSink,
+    'personalities': PersonalityTextSink,
+    'csv': CsvSink
+}
+
+def open_sinks(paths, buffer_size=OUTPUT_BUFFER_SIZE, append=False):
+    """
+    Open one sink per format
+    
+    Args:
+        paths: dict of format name ('jsonl', 'txt', 'personalities', 'csv') -> file path
+        append: Add to existing files instead of starting them over
+    """
+    return [SINK_TYPES[fmt](path, buffer_size, append) for fmt, path in paths.items()]
+
+def build_reactions_json(jsonl_path, json_path):
+    """Consolidate a JSONL stream into the indented reactions.json array, one entry at a time"""
+    count = 0
+    with open(jsonl_path, 'r', encoding='utf-8') as src, open(json_path, 'w', encoding='utf-8') as dst:
+        dst.write('[')
+        for line in src:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            dst.write(',\n' if count else '\n')
+            dst.write('\n'.join('  ' + l for l in json.dumps(entry, indent=2, ensure_ascii=False).splitlines()))
+            count += 1
+        dst.write('\n]' if count else ']')
+    
+    logger.info("📄 Saved JSON: %s (%d entries)", json_path, count)
+    return count
\ No newline at end of file
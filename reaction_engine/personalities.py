@@ -1,6 +1,7 @@
 """
 Database of football personalities with unique speaking styles
 """
+import random
 
 FOOTBALL_PERSONALITIES = {
     # LEGENDARY PLAYERS
@@ -205,17 +206,8 @@ PERSONALITY_GROUPS = {
     "manager_perspective": ["Pep Guardiola", "Jose Mourinho", "Jurgen Klopp", "Carlo Ancelotti"]
 }
 
-def get_personality_for_context(performance_quality, is_big_match, position_type):
-    """
-    Select appropriate personality based on match context
-    
-    Args:
-        performance_quality: 'excellent', 'good', 'poor'
-        is_big_match: Boolean
-        position_type: 'striker', 'midfielder', 'defender', 'goalkeeper'
-    """
-    import random
-    
+def _candidate_pool(performance_quality, is_big_match, position_type):
+    """Context-appropriate personalities, in a fixed order (first appearance wins)"""
     candidates = []
     
     # Performance-based selection
@@ -238,6 +230,41 @@ def get_personality_for_context(performance_quality, is_big_match, position_type
     # Always include tactical analysts
     candidates.extend(PERSONALITY_GROUPS['tactical_analysts'])
     
-    # Remove duplicates and pick
-    candidates = list(set(candidates))
-    return random.choice(candidates) if candidates else random.choice(list(FOOTBALL_PERSONALITIES.keys()))
\ No newline at end of file
+    # Remove duplicates - dict keeps the order, so a seeded pick is reproducible
+    return tuple(dict.fromkeys(candidates))
+
+
+# Selection tables, compiled once at import
+ALL_PERSONALITIES = tuple(FOOTBALL_PERSONALITIES)
+MANAGERS = tuple(
+    name for name, data in FOOTBALL_PERSONALITIES.items()
+    if 'Manager' in data['role'] or 'Coach' in data['role']
+)
+HARSH_CRITICS = frozenset(PERSONALITY_GROUPS['harsh_critics'])
+ENTHUSIASTIC_SUPPORTERS = tuple(PERSONALITY_GROUPS['enthusiastic_supporters'])
+
+PERFORMANCE_QUALITIES = ('excellent', 'good', 'poor')
+POSITION_TYPES = ('striker', 'midfielder', 'defender', 'goalkeeper')
+
+# (performance_quality, is_big_match, position_type) -> candidate tuple
+CANDIDATE_POOLS = {
+    (quality, big, position): _candidate_pool(quality, big, position)
+    for quality in PERFORMANCE_QUALITIES
+    for big in (False, True)
+    for position in POSITION_TYPES
+}
+
+def get_personality_for_context(performance_quality, is_big_match, position_type, rng=random):
+    """
+    Select appropriate personality based on match context
+    
+    Args:
+        performance_quality: 'excellent', 'good', 'poor'
+        is_big_match: Boolean
+        position_type: 'striker', 'midfielder', 'defender', 'goalkeeper'
+        rng: random.Random to draw from (seed it for reproducible panels)
+    """
+    candidates = CANDIDATE_POOLS.get((performance_quality, bool(is_big_match), position_type))
+    if candidates is None:
+        candidates = _candidate_pool(performance_quality, is_big_match, position_type)
+    return rng.choice(candidates) if candidates else rng.choice(ALL_PERSONALITIES)
\ No newline at end of file
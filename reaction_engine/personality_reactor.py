@@ -1,100 +1,222 @@
-import random
-from personalities import FOOTBALL_PERSONALITIES, get_personality_for_context, PERSONALITY_GROUPS
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from config import (
+    PANEL_SINGLE_REQUEST, PANEL_CONCURRENT_CALLS, PANEL_MAX_TOKENS, PERSONALITY_VARIETY_WINDOW, RUN_SEED
+)
+from checkpoint import row_key, row_rng
+from engine_logging import get_logger
+from personalities import (
+    FOOTBALL_PERSONALITIES, ALL_PERSONALITIES, MANAGERS, HARSH_CRITICS, ENTHUSIASTIC_SUPPORTERS,
+    get_personality_for_context
+)
+
+PLAYER_RELATIONSHIPS = {
+    'teammate': 'playing alongside',
+    'opponent': 'playing against',
+    'legend': 'watching from retirement'
+}
+
+logger = get_logger('personalities')
+
+PANEL_TEMPERATURE = 0.85  # One request covers pundits (0.88), manager (0.80) and player (0.85)
+
+RECENT_EXCLUDED = 3  # The last panel's pundits sit out the next one
+
+# Reacting players by reaction_type
+LEGEND_REACTORS = ('Thierry Henry', 'Ronaldinho', 'Zlatan Ibrahimovic',
+                   'Andrea Pirlo', 'Xavi Hernandez', 'Didier Drogba')
+ACTIVE_REACTORS = ('Cristiano Ronaldo', 'Lionel Messi', 'Sergio Ramos')
+
+POSITION_GUESSES = ('midfielder', 'defender', 'striker')
+
+# Static prompt preambles. Each prompt starts with its speaker's preamble, rendered once
+# per personality (render_preamble), so a speaker's prompts share a cacheable prefix
+# across rows; only the short match segment after it is built per row.
+PUNDIT_PREAMBLE = """You are {name}, the {role}.
+
+YOUR CHARACTER TRAITS:
+- Speaking Style: {style}
+- Key Traits: {traits}
+- Expertise: {expertise}
+- Common Phrases (use sparingly and naturally): {catchphrases}
+
+YOUR TASK:
+React to the performance below in YOUR authentic voice. Stay true to your personality:
+- Use YOUR typical speaking patterns
+- Reference YOUR areas of expertise
+- Show YOUR characteristic attitude (critical/supportive/analytical)
+- Keep it 2-4 sentences
+- Sound EXACTLY like the real {name} would
+
+CRITICAL: Do NOT use generic commentary. This must sound like YOU specifically.
+"""
+
+COACH_PREAMBLE = """You are {name}, speaking in your post-match press conference.
+
+Respond in YOUR authentic managerial style:
+- {style}
+- Traits: {traits}
+
+Keep it brief (2-3 sentences), authentic to YOUR character, and appropriate for a press conference.
+"""
+
+PLAYER_PREAMBLE = """You are {name}.
+
+React in YOUR authentic voice as {name}:
+- Style: {style}
+- Traits: {traits}
+
+1-2 sentences maximum. Sound exactly like {name} would.
+"""
+
+PANEL_INSTRUCTIONS = """Write a reaction to the performance below from EACH of the real football personalities listed, in their own authentic voice.
+
+CRITICAL: Do NOT use generic commentary, and do not let the speakers share phrasing. Each reaction must sound EXACTLY like that real person.
+"""
+
+PANEL_PUNDIT = """{name}, the {role}
+- Speaking Style: {style}
+- Key Traits: {traits}
+- Expertise: {expertise}
+- Common Phrases (use sparingly and naturally): {catchphrases}
+- 2-4 sentences, showing their characteristic attitude (critical/supportive/analytical)"""
+
+PANEL_MANAGER = """{name}, speaking in the post-match press conference about their player
+- Style: {style}
+- Traits: {traits}
+- 2-3 sentences, appropriate for a press conference"""
+
+PANEL_PLAYER = """
+- Style: {style}
+- Traits: {traits}
+- 1-2 sentences maximum"""
+
+@lru_cache(maxsize=None)
+def render_preamble(template, name):
+    """template filled with one personality's static fields, cached per (template, personality)"""
+    personality = FOOTBALL_PERSONALITIES[name]
+    return template.format(
+        name=name,
+        role=personality['role'],
+        style=personality['style'],
+        traits=', '.join(personality['traits']),
+        expertise=', '.join(personality['expertise']),
+        catchphrases=', '.join(personality['catchphrases'][:2])
+    )
+
+def match_segment(row, context_narrative):
+    """Per-row match block shared by the pundit and panel prompts"""
+    return f"""
+MATCH PERFORMANCE TO ANALYZE:
+Player: {row.get('playername', 'Unknown Player')}
+Team: {row.get('team', 'Unknown Team')} vs {row.get('opponent', 'Unknown Opponent')}
+Goals: {row.get('goals', 0)}
+Rating: {row.get('rating', 'N/A')}/10
+Minutes: {row.get('minsplayed', 0)}
+
+MATCH CONTEXT:
+{context_narrative}"""
+
 
 class PersonalityReactor:
     """Generates reactions from different football personalities"""
     
-    def __init__(self, llm_client):
+    def __init__(self, llm_client, seed=RUN_SEED):
         self.llm = llm_client
-        self.used_personalities = []  # Prevent immediate repetition
         
-    def select_personalities(self, row, context_tags, num_personalities=3):
+        # Every pick (pundits, manager, reactor, position guess) comes from the row's
+        # own RNG (checkpoint.row_rng), so a row gets the same panel in any run or worker
+        # that has seen the same recent pundits
+        self.seed = seed
+        
+        # Prevent immediate repetition: the last PERSONALITY_VARIETY_WINDOW pundits,
+        # with the last RECENT_EXCLUDED of them kept in a set for O(1) lookups
+        self._recent = deque(maxlen=PERSONALITY_VARIETY_WINDOW)
+        self._excluded = set()
+        
+        # Package generation: one structured request, or five calls run concurrently
+        self.single_request = PANEL_SINGLE_REQUEST
+        self.concurrent_calls = PANEL_CONCURRENT_CALLS
+        self._executor = None
+    
+    @property
+    def used_personalities(self):
+        """Recently used pundits, oldest first"""
+        return list(self._recent)
+    
+    @used_personalities.setter
+    def used_personalities(self, names):
+        self._recent.clear()
+        self._remember(names)
+    
+    def _remember(self, names):
+        self._recent.extend(names)
+        self._excluded = set(list(self._recent)[-RECENT_EXCLUDED:])
+        
+    def row_rng(self, row, purpose='personalities'):
+        """The row's RNG for one pick ('personalities', 'manager' or 'player')"""
+        return row_rng(row, purpose, self.seed)
+    
+    def select_personalities(self, row, context_tags, num_personalities=3, rng=None):
         """
         Select diverse personalities for this match
         
         Returns list of personality names
         """
+        if rng is None:
+            rng = self.row_rng(row)
+        
         performance_quality = self._assess_performance(row)
         is_big_match = context_tags.get('is_big_match', False)
-        position = self._guess_position(row)
+        position = self._guess_position(row, rng)
         
+        # Recently used and already picked personalities are skipped
+        taken = set(self._excluded)
         selected = []
-        available = list(FOOTBALL_PERSONALITIES.keys())
         
-        # Remove recently used to increase variety
-        if len(self.used_personalities) > 10:
-            self.used_personalities = self.used_personalities[-10:]
-        
-        for personality in self.used_personalities[-3:]:
-            if personality in available:
-                available.remove(personality)
+        def take(name):
+            selected.append(name)
+            taken.add(name)
         
         # Get context-appropriate personality
-        primary = get_personality_for_context(performance_quality, is_big_match, position)
-        if primary in available:
-            selected.append(primary)
-            available.remove(primary)
+        primary = get_personality_for_context(performance_quality, is_big_match, position, rng)
+        if primary not in taken:
+            take(primary)
         
         # Add contrasting personality (if primary is harsh, add enthusiastic)
-        if primary in PERSONALITY_GROUPS['harsh_critics']:
-            contrasting = random.choice(PERSONALITY_GROUPS['enthusiastic_supporters'])
-            if contrasting in available and contrasting not in selected:
-                selected.append(contrasting)
-                available.remove(contrasting)
-        
-        # Fill remaining slots with variety
-        while len(selected) < num_personalities and available:
-            choice = random.choice(available)
-            selected.append(choice)
-            available.remove(choice)
+        if primary in HARSH_CRITICS:
+            contrasting = rng.choice(ENTHUSIASTIC_SUPPORTERS)
+            if contrasting not in taken:
+                take(contrasting)
+        
+        # Fill remaining slots with variety - redraw on a taken name (a handful of
+        # names are taken out of the whole database, so this settles in a draw or two)
+        while len(selected) < num_personalities and len(taken) < len(ALL_PERSONALITIES):
+            choice = rng.choice(ALL_PERSONALITIES)
+            if choice not in taken:
+                take(choice)
         
         # Remember these
-        self.used_personalities.extend(selected)
+        self._remember(selected)
         
         return selected
     
+    def build_personality_prompt(self, personality_name, row, context_narrative, segment=None):
+        """
+        Build the prompt for a specific personality's perspective
+        
+        segment: the row's match_segment, when building several prompts for one row
+        """
+        if segment is None:
+            segment = match_segment(row, context_narrative)
+        return render_preamble(PUNDIT_PREAMBLE, personality_name) + segment
+    
     def generate_personality_reaction(self, personality_name, row, context_tags, context_narrative):
         """Generate reaction from specific personality's perspective"""
-        
-        personality = FOOTBALL_PERSONALITIES[personality_name]
-        
-        player = row.get('playername', 'Unknown Player')
-        team = row.get('team', 'Unknown Team')
-        opponent = row.get('opponent', 'Unknown Opponent')
-        goals = row.get('goals', 0)
-        rating = row.get('rating', 'N/A')
-        mins = row.get('minsplayed', 0)
-        
-        # Build personality-specific prompt
-        prompt = f"""You are {personality_name}, the {personality['role']}.
-
-YOUR CHARACTER TRAITS:
-- Speaking Style: {personality['style']}
-- Key Traits: {', '.join(personality['traits'])}
-- Expertise: {', '.join(personality['expertise'])}
-- Common Phrases (use sparingly and naturally): {', '.join(personality['catchphrases'][:2])}
-
-MATCH PERFORMANCE TO ANALYZE:
-Player: {player}
-Team: {team} vs {opponent}
-Goals: {goals}
-Rating: {rating}/10
-Minutes: {mins}
-
-MATCH CONTEXT:
-{context_narrative}
-
-YOUR TASK:
-React to {player}'s performance in YOUR authentic voice. Stay true to your personality:
-- Use YOUR typical speaking patterns
-- Reference YOUR areas of expertise
-- Show YOUR characteristic attitude (critical/supportive/analytical)
-- Keep it 2-4 sentences
-- Sound EXACTLY like the real {personality_name} would
-
-CRITICAL: Do NOT use generic commentary. This must sound like YOU specifically. What would {personality_name} actually say about this?"""
-
-        return self.llm.generate_reaction(prompt, temperature=0.88)
+        prompt = self.build_personality_prompt(personality_name, row, context_narrative)
+        return self.llm.generate_reaction(prompt, temperature=0.88, cache_scope=row_key(row))
     
     def generate_multi_personality_panel(self, row, context_tags, context_narrative, num_personalities=3):
         """
@@ -105,9 +227,8 @@ CRITICAL: Do NOT use generic commentary. This must sound like YOU specifically.
         personalities = self.select_personalities(row, context_tags, num_personalities)
         
         reactions = {}
-        player = row.get('playername', 'Unknown Player')
         
-        print(f"   🎙️ Panel: {', '.join(personalities)}")
+        logger.info("   🎙️ Panel: %s", ', '.join(personalities))
         
         for personality in personalities:
             reaction = self.generate_personality_reaction(
@@ -117,76 +238,60 @@ CRITICAL: Do NOT use generic commentary. This must sound like YOU specifically.
         
         return reactions
     
-    def generate_coach_reaction(self, row, context_tags, is_own_team=True):
-        """Generate reaction from a manager's perspective"""
-        
-        # Select a manager
-        managers = [p for p, data in FOOTBALL_PERSONALITIES.items() 
-                   if 'Manager' in data['role'] or 'Coach' in data['role']]
-        manager = random.choice(managers)
+    def build_coach_prompt(self, row, is_own_team=True, rng=None):
+        """
+        Pick a manager and build their press-conference prompt
         
-        personality = FOOTBALL_PERSONALITIES[manager]
-        player = row.get('playername', 'Unknown Player')
-        rating = row.get('rating', 'N/A')
+        Returns (manager name, prompt)
+        """
+        if rng is None:
+            rng = self.row_rng(row, 'manager')
+        manager = rng.choice(MANAGERS)
         
         perspective = "your player" if is_own_team else "the opposition player"
+        prompt = render_preamble(COACH_PREAMBLE, manager) + f"""
+You're being asked about {row.get('playername', 'Unknown Player')}'s performance ({row.get('rating', 'N/A')}/10 rating).
+This is {perspective}."""
+        
+        return manager, prompt
+    
+    def generate_coach_reaction(self, row, context_tags, is_own_team=True):
+        """Generate reaction from a manager's perspective"""
+        manager, prompt = self.build_coach_prompt(row, is_own_team)
         
-        prompt = f"""You are {manager}, speaking in your post-match press conference.
-
-You're being asked about {player}'s performance ({rating}/10 rating).
-This is {perspective}.
-
-Respond in YOUR authentic managerial style:
-- {personality['style']}
-- Traits: {', '.join(personality['traits'])}
-
-Keep it brief (2-3 sentences), authentic to YOUR character, and appropriate for a press conference."""
-
         return {
             'manager': manager,
-            'reaction': self.llm.generate_reaction(prompt, temperature=0.80)
+            'reaction': self.llm.generate_reaction(prompt, temperature=0.80, cache_scope=row_key(row))
         }
     
-    def generate_player_reaction(self, row, context_tags, reaction_type='teammate'):
+    def build_player_prompt(self, row, reaction_type='teammate', rng=None):
         """
-        Generate reaction from another player's perspective
+        Pick a reacting player and build their prompt
         
         reaction_type: 'teammate', 'opponent', 'legend'
+        Returns (reactor name, prompt)
         """
-        # Filter active players vs legends
-        if reaction_type == 'legend':
-            players = ['Thierry Henry', 'Ronaldinho', 'Zlatan Ibrahimovic', 
-                      'Andrea Pirlo', 'Xavi Hernandez', 'Didier Drogba']
-        else:
-            players = ['Cristiano Ronaldo', 'Lionel Messi', 'Sergio Ramos']
+        if rng is None:
+            rng = self.row_rng(row, 'player')
+        reactor = rng.choice(LEGEND_REACTORS if reaction_type == 'legend' else ACTIVE_REACTORS)
+        prompt = render_preamble(PLAYER_PREAMBLE, reactor) + f"""
+You are {PLAYER_RELATIONSHIPS[reaction_type]} {row.get('playername', 'Unknown Player')}.
+Their performance today: {row.get('goals', 0)} goals, {row.get('rating', 'N/A')}/10 rating"""
         
-        reactor = random.choice(players)
-        personality = FOOTBALL_PERSONALITIES[reactor]
-        
-        player = row.get('playername', 'Unknown Player')
-        goals = row.get('goals', 0)
-        rating = row.get('rating', 'N/A')
-        
-        relationship = {
-            'teammate': 'playing alongside',
-            'opponent': 'playing against',
-            'legend': 'watching from retirement'
-        }[reaction_type]
+        return reactor, prompt
+    
+    def generate_player_reaction(self, row, context_tags, reaction_type='teammate'):
+        """
+        Generate reaction from another player's perspective
         
-        prompt = f"""You are {reactor}, {relationship} {player}.
-
-Their performance today: {goals} goals, {rating}/10 rating
-
-React in YOUR authentic voice as {reactor}:
-- Style: {personality['style']}
-- Traits: {', '.join(personality['traits'])}
-
-1-2 sentences maximum. Sound exactly like {reactor} would."""
+        reaction_type: 'teammate', 'opponent', 'legend'
+        """
+        reactor, prompt = self.build_player_prompt(row, reaction_type)
 
         return {
             'reactor': reactor,
             'relationship': reaction_type,
-            'reaction': self.llm.generate_reaction(prompt, temperature=0.85)
+            'reaction': self.llm.generate_reaction(prompt, temperature=0.85, cache_scope=row_key(row))
         }
     
     def _assess_performance(self, row):
@@ -201,13 +306,13 @@ React in YOUR authentic voice as {reactor}:
                 return 'poor'
         return 'good'
     
-    def _guess_position(self, row):
+    def _guess_position(self, row, rng):
         """Guess position from goals scored (rough heuristic)"""
         goals = row.get('goals', 0)
         if goals >= 2:
             return 'striker'
         # Could enhance this with actual position data
-        return random.choice(['midfielder', 'defender', 'striker'])
+        return rng.choice(POSITION_GUESSES)
     
     def generate_full_reaction_package(self, row, context_tags, context_narrative):
         """
@@ -216,12 +321,167 @@ React in YOUR authentic voice as {reactor}:
         - 1 manager reaction
         - 1 player reaction
         """
-        package = {
-            'pundits': self.generate_multi_personality_panel(
-                row, context_tags, context_narrative, num_personalities=3
-            ),
-            'manager': self.generate_coach_reaction(row, context_tags, is_own_team=True),
-            'player': self.generate_player_reaction(row, context_tags, reaction_type='teammate')
+        plan = self.plan_full_reaction_package(row, context_tags, context_narrative)
+        return self.run_reaction_package(plan)
+    
+    def plan_full_reaction_package(self, row, context_tags, context_narrative):
+        """
+        Make every selection for a reaction package and build its prompts
+        without calling the LLM.
+        
+        All random picks and used_personalities bookkeeping happen here, so
+        planning rows in input order keeps variety identical to the
+        sequential path even when the LLM calls later run concurrently.
+        """
+        # Each pick draws from the row's own stream for it, so the manager and
+        # teammate never depend on how many redraws the pundits needed
+        personalities = self.select_personalities(row, context_tags, num_personalities=3)
+        logger.info("   🎙️ Panel: %s", ', '.join(personalities))
+        
+        manager, coach_prompt = self.build_coach_prompt(row, is_own_team=True)
+        reactor, player_prompt = self.build_player_prompt(row, reaction_type='teammate')
+        
+        # The match block is formatted once and shared by every pundit's prompt
+        segment = match_segment(row, context_narrative)
+        
+        plan = {
+            'pundits': [
+                (p, self.build_personality_prompt(p, row, context_narrative, segment))
+                for p in personalities
+            ],
+            'manager': (manager, coach_prompt),
+            'player': (reactor, 'teammate', player_prompt),
+            'scope': row_key(row)  # Response cache entries belong to this row
+        }
+        
+        if self.single_request:
+            plan['panel_prompt'] = self.build_panel_prompt(
+                personalities, manager, reactor, 'teammate', row, context_narrative, segment
+            )
+        
+        return plan
+    
+    def build_panel_prompt(self, personalities, manager, reactor, reaction_type, row, context_narrative,
+                           segment=None):
+        """
+        One prompt for the whole package: the static instructions, the
+        match described once, then every speaker's voice, with the
+        reactions returned as a JSON object keyed pundit_1..pundit_N,
+        manager, player.
+        """
+        player = row.get('playername', 'Unknown Player')
+        if segment is None:
+            segment = match_segment(row, context_narrative)
+        
+        speakers = [f"pundit_{i}: {render_preamble(PANEL_PUNDIT, name)}" for i, name in enumerate(personalities, 1)]
+        speakers.append(f"manager: {render_preamble(PANEL_MANAGER, manager)}")
+        speakers.append(f"player: {reactor}, {PLAYER_RELATIONSHIPS[reaction_type]} {player}"
+                        f"{render_preamble(PANEL_PLAYER, reactor)}")
+
+        keys = ', '.join(f'"{key}": "..."' for key in self._panel_keys(len(personalities)))
+        
+        return f"""{PANEL_INSTRUCTIONS}{segment}
+
+SPEAKERS:
+
+{chr(10).join(speakers)}
+
+Return ONLY a JSON object with exactly these keys:
+{{{keys}}}"""
+
+    @staticmethod
+    def _panel_keys(num_pundits):
+        return [f"pundit_{i}" for i in range(1, num_pundits + 1)] + ['manager', 'player']
+    
+    def _package_calls(self, plan):
+        """(prompt, temperature, usage label) for each separate call, pundits then manager then player"""
+        manager, coach_prompt = plan['manager']
+        reactor, _, player_prompt = plan['player']
+        return (
+            [(prompt, 0.88, f'personality/{name}') for name, prompt in plan['pundits']]
+            + [(coach_prompt, 0.80, f'personality/{manager}'), (player_prompt, 0.85, f'personality/{reactor}')]
+        )
+    
+    def _assemble_package(self, plan, texts):
+        """Put reaction texts (in _package_calls order) back into the package shape"""
+        *pundit_texts, manager_text, player_text = texts
+        manager = plan['manager'][0]
+        reactor, relationship, _ = plan['player']
+        
+        return {
+            'pundits': {
+                name: text for (name, _), text in zip(plan['pundits'], pundit_texts)
+            },
+            'manager': {'manager': manager, 'reaction': manager_text},
+            'player': {'reactor': reactor, 'relationship': relationship, 'reaction': player_text}
         }
+    
+    def parse_panel_response(self, text, plan):
+        """Split a combined panel response into the package shape (None if unusable)"""
+        keys = self._panel_keys(len(plan['pundits']))
+        reactions = self.llm.parse_json_reactions(text, keys)
+        if reactions is None:
+            return None
+        return self._assemble_package(plan, [reactions[key] for key in keys])
+    
+    def run_reaction_package(self, plan):
+        """
+        Run the LLM calls for a planned reaction package
+        
+        Single-request mode asks for the whole panel at once and falls back
+        to separate calls if the response won't parse; separate calls run
+        concurrently unless concurrent_calls is off.
+        """
+        if plan.get('panel_prompt'):
+            package = self.parse_panel_response(self.llm.generate_reaction(
+                plan['panel_prompt'], temperature=PANEL_TEMPERATURE, max_tokens=PANEL_MAX_TOKENS,
+                json_mode=True, mode='panel_combined', cache_scope=plan.get('scope')
+            ), plan)
+            if package is not None:
+                self.llm.count_mode_row('panel_combined')
+                return package
+            self.llm.count_unusable('panel_combined')
+            logger.warning("⚠️ Combined panel response unusable - falling back to separate calls")
+        
+        calls = self._package_calls(plan)
+        
+        def call(package_call):
+            prompt, temp, label = package_call
+            return self.llm.generate_reaction(prompt, temperature=temp, mode='panel_split', label=label,
+                                              cache_scope=plan.get('scope'))
+        
+        if self.concurrent_calls:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix="panel")
+            texts = list(self._executor.map(call, calls))
+        else:
+            texts = [call(c) for c in calls]
+        
+        self.llm.count_mode_row('panel_split')
+        return self._assemble_package(plan, texts)
+    
+    async def agenerate_full_reaction_package(self, plan):
+        """
+        Run a planned reaction package with all its LLM calls in flight at once
+        
+        Returns the same shape as generate_full_reaction_package
+        """
+        if plan.get('panel_prompt'):
+            package = self.parse_panel_response(await self.llm.agenerate_reaction(
+                plan['panel_prompt'], temperature=PANEL_TEMPERATURE, max_tokens=PANEL_MAX_TOKENS,
+                json_mode=True, mode='panel_combined', cache_scope=plan.get('scope')
+            ), plan)
+            if package is not None:
+                self.llm.count_mode_row('panel_combined')
+                return package
+            self.llm.count_unusable('panel_combined')
+            logger.warning("⚠️ Combined panel response unusable - falling back to separate calls")
+        
+        texts = await asyncio.gather(*[
+            self.llm.agenerate_reaction(prompt, temperature=temp, mode='panel_split', label=label,
+                                        cache_scope=plan.get('scope'))
+            for prompt, temp, label in self._package_calls(plan)
+        ])
         
-        return package
\ No newline at end of file
+        self.llm.count_mode_row('panel_split')
+        return self._assemble_package(plan, texts)
\ No newline at end of file
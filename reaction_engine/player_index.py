@@ -0,0 +1,110 @@
+import bisect
+import difflib
+import unicodedata
+import numpy as np
+
+def normalize_name(name):
+    """Casefold and strip accents, so 'joao felix' finds 'João Félix'"""
+    text = unicodedata.normalize('NFKD', str(name))
+    return ''.join(c for c in text if not unicodedata.combining(c)).casefold().strip()
+
+
+class PlayerIndex:
+    """
+    Lookup tables over df_player, built once at load time:
+    playerid -> row positions, normalized name -> playerids (from any frame
+    that has both columns, so season stats can name players whose match
+    history only carries ids), sorted names for prefix search, and an
+    n-gram -> names map for substring search.
+    """
+    
+    GRAM = 3  # Substrings up to this long are looked up directly; longer ones intersect their n-grams
+    
+    def __init__(self, df_player, df_season=None):
+        self.df_player = df_player
+        
+        self.rows_by_id = df_player.groupby('playerid', sort=False).indices if 'playerid' in df_player else {}
+        
+        # Match history that carries names directly
+        self.rows_by_name = {}
+        if 'playername' in df_player:
+            names = df_player['playername'].astype(str)
+            normalized = names.map({name: normalize_name(name) for name in names.unique()})
+            self.rows_by_name = normalized.groupby(normalized.to_numpy(), sort=False).indices
+        
+        self.ids_by_name = {}
+        for frame in (df_player, df_season):
+            if frame is None or 'playername' not in frame or 'playerid' not in frame:
+                continue
+            pairs = frame[['playername', 'playerid']].dropna().drop_duplicates()
+            for name, player_id in zip(pairs['playername'], pairs['playerid']):
+                self.ids_by_name.setdefault(normalize_name(name), set()).add(player_id)
+        
+        self.sorted_names = sorted(set(self.rows_by_name) | set(self.ids_by_name))
+        
+        # Every substring of length 1..GRAM -> the names containing it
+        self.names_by_gram = {}
+        for name in self.sorted_names:
+            grams = {name[i:i + n] for n in range(1, self.GRAM + 1) for i in range(len(name) - n + 1)}
+            for gram in grams:
+                self.names_by_gram.setdefault(gram, set()).add(name)
+    
+    def prefix_matches(self, query):
+        """Normalized names starting with query"""
+        q = normalize_name(query)
+        start = bisect.bisect_left(self.sorted_names, q)
+        end = bisect.bisect_left(self.sorted_names, q + '\uffff')
+        return self.sorted_names[start:end]
+    
+    def substring_matches(self, q):
+        """Normalized names containing the normalized query q, in sorted order"""
+        if len(q) <= self.GRAM:
+            return sorted(self.names_by_gram.get(q, ()))
+        
+        # Candidates hold every n-gram of q; smallest set first keeps the intersection cheap
+        grams = sorted((self.names_by_gram.get(q[i:i + self.GRAM], set()) for i in range(len(q) - self.GRAM + 1)),
+                       key=len)
+        candidates = set.intersection(*grams)
+        return sorted(name for name in candidates if q in name)
+    
+    def find_names(self, query, fuzzy=True):
+        """
+        Resolve a player query to normalized names
+        
+        Every name containing the query (the old str.contains behaviour),
+        ordered exact match, then prefix, then substring matches. Close fuzzy
+        matches only when nothing contains it.
+        """
+        q = normalize_name(query)
+        if not q:
+            return []
+        
+        exact = [q] if q in self.rows_by_name or q in self.ids_by_name else []
+        matches = dict.fromkeys(exact + self.prefix_matches(q) + self.substring_matches(q))
+        if matches:
+            return list(matches)
+        
+        if fuzzy:
+            return difflib.get_close_matches(q, self.sorted_names, n=3, cutoff=0.8)
+        
+        return []
+    
+    def player_ids(self, query, fuzzy=True):
+        """All playerids for a player query"""
+        ids = set()
+        for name in self.find_names(query, fuzzy):
+            ids |= self.ids_by_name.get(name, set())
+        return ids
+    
+    def rows_for(self, query, fuzzy=True):
+        """df_player rows for a player query, in original order"""
+        positions = []
+        for name in self.find_names(query, fuzzy):
+            positions.append(self.rows_by_name.get(name, ()))
+            for player_id in self.ids_by_name.get(name, ()):
+                positions.append(self.rows_by_id.get(player_id, ()))
+        
+        if not positions:
+            return self.df_player.iloc[0:0]
+        
+        return self.df_player.iloc[np.unique(np.concatenate(positions).astype(int))]
\ No newline at end of file
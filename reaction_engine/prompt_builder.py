@@ -1,9 +1,29 @@
 import random
+from config import RUN_SEED
+from checkpoint import row_rng
+
+# Static part of the enriched prompt, identical for every row. It goes first and only
+# the match segment after it is built per row, so provider-side prompt caching can
+# reuse the prefix across requests.
+ENRICHED_PREFIX = """🎨 YOUR TASK:
+React to the match performance below. Be authentic and varied - never use clichéd phrases like "clinical finish" or "exceptional display" unless truly warranted.
+
+Generate a natural, flowing reaction that captures the essence of this performance. Make it feel real and spontaneous, like you're genuinely excited or analytical about what you witnessed.
+
+IMPORTANT:
+- Vary your vocabulary every time
+- Use specific details from the stats
+- Don't overuse adjectives
+- Sound like a real human, not a template
+- If the performance was average, say so honestly
+"""
 
 class DynamicPromptBuilder:
     """Builds varied, context-rich prompts for LLM"""
     
-    def __init__(self):
+    def __init__(self, seed=RUN_SEED):
+        self.seed = seed  # Per-row tone/focus picks (see checkpoint.row_rng)
+        
         self.emotion_modifiers = [
             "passionate", "analytical", "excited", "dramatic", 
             "balanced", "enthusiastic", "critical", "celebratory"
@@ -17,53 +37,31 @@ class DynamicPromptBuilder:
             "clutch performance under pressure"
         ]
     
-    def build_enriched_prompt(self, row, team_stats, context_tags, context_narrative):
-        """Build a rich, varied prompt with full context"""
-        
-        # Random emotional modifier for variety
-        tone_modifier = random.choice(self.emotion_modifiers)
-        focus = random.choice(self.focus_areas)
-        
-        # Base player/match info
-        player = row.get('playername', 'Unknown Player')
-        team = row.get('team', 'Unknown Team')
-        opponent = row.get('opponent', 'Unknown Opponent')
-        goals = row.get('goals', 0)
-        mins = row.get('minsplayed', 0)
-        rating = row.get('rating', 'N/A')
-        
-        # Team standing
+    def build_enriched_prompt(self, row, team_stats, context_tags, context_narrative, rng=None):
+        """
+        Build a rich, varied prompt with full context (static ENRICHED_PREFIX first, then the match)
+        
+        The tone and focus come from rng, by default the row's own, so the same
+        row always gets the same prompt.
+        """
+        if rng is None:
+            rng = row_rng(row, 'prompt', self.seed)
         team_record = f"{team_stats.get('wins', 0)}W-{team_stats.get('draws', 0)}D-{team_stats.get('losses', 0)}L"
-        team_pts = team_stats.get('points', 0)
         
-        # Build comprehensive prompt
-        prompt = f"""You are a {tone_modifier} football journalist covering this match performance.
+        return ENRICHED_PREFIX + f"""
+You are a {rng.choice(self.emotion_modifiers)} football journalist. Focus on {rng.choice(self.focus_areas)}.
 
 🎯 MATCH DETAILS:
-Player: {player}
-Team: {team} ({team_pts} points, {team_record})
-Opponent: {opponent}
-Goals Scored: {goals}
-Minutes Played: {mins}
-Match Rating: {rating}/10
+Player: {row.get('playername', 'Unknown Player')}
+Team: {row.get('team', 'Unknown Team')} ({team_stats.get('points', 0)} points, {team_record})
+Opponent: {row.get('opponent', 'Unknown Opponent')}
+Goals Scored: {row.get('goals', 0)}
+Minutes Played: {row.get('minsplayed', 0)}
+Match Rating: {row.get('rating', 'N/A')}/10
 
 📊 CONTEXT & NARRATIVE:
 {context_narrative}
-
-🎨 YOUR TASK:
-Focus on {focus}. Be authentic and varied - never use clichéd phrases like "clinical finish" or "exceptional display" unless truly warranted. 
-
-Generate a natural, flowing reaction that captures the essence of this performance. Make it feel real and spontaneous, like you're genuinely excited or analytical about what you witnessed.
-
-IMPORTANT: 
-- Vary your vocabulary every time
-- Use specific details from the stats
-- Don't overuse adjectives
-- Sound like a real human, not a template
-- If the performance was average, say so honestly
 """
-        
-        return prompt
     
     def build_comparative_prompt(self, row, team_stats, context_tags, recent_performances):
         """Build prompt that compares to recent form"""
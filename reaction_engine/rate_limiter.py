@@ -0,0 +1,100 @@
+import random
+import threading
+import time
+from config import RATE_LIMIT_RPM, RATE_LIMIT_TPM, RETRY_BASE_DELAY, RETRY_MAX_DELAY
+
+class RateLimiter:
+    """
+    Token-bucket limiter enforcing requests-per-minute and tokens-per-minute
+    budgets. Thread-safe, so one instance can be shared by every LLMClient
+    (and the worker threads of the async batch mode) in a process.
+    """
+
+    def __init__(self, requests_per_minute=RATE_LIMIT_RPM, tokens_per_minute=RATE_LIMIT_TPM):
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        self._lock = threading.Lock()
+
+        # Buckets start full so a fresh run can burst up to the budget
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+
+        self.total_wait = 0.0
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60.0)
+
+    def acquire(self, estimated_tokens):
+        """
+        Block until one request and estimated_tokens fit in the budget
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    wait = 0.0
+                    if self.rpm and self._requests < 1:
+                        wait = (1 - self._requests) * 60.0 / self.rpm
+                    if self.tpm:
+                        # Never wait for more than a full bucket
+                        needed = min(estimated_tokens, self.tpm)
+                        if self._tokens < needed:
+                            wait = max(wait, (needed - self._tokens) * 60.0 / self.tpm)
+
+                if wait <= 0:
+                    if self.rpm:
+                        self._requests -= 1
+                    if self.tpm:
+                        self._tokens -= estimated_tokens
+                    self.total_wait += waited
+                    return waited
+
+            time.sleep(wait)
+            waited += wait
+
+    def reconcile(self, estimated_tokens, actual_tokens):
+        """Correct the token bucket once the real usage of a request is known"""
+        if not self.tpm:
+            return
+        with self._lock:
+            self._tokens = min(self.tpm, self._tokens + estimated_tokens - actual_tokens)
+
+    def pause(self, seconds):
+        """Hold back every caller for a while (after the provider says 429)"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+    if retry_after:
+        delay = max(delay, retry_after)
+    return delay
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+def get_shared_limiter():
+    """Process-wide limiter used by LLMClient unless one is passed in"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
\ No newline at end of file
@@ -1,60 +1,135 @@
-import sys
-from pathlib import Path
-import pandas as pd
+import os
+import asyncio
 import json
+import logging
+import threading
 import time
 from datetime import datetime
-from config import *
+from config import (
+    BIGMATCHUPS_CSV, SEASONSTATS_CSV, PLAYERMATCH_CSV, REACTIONS_TXT, REACTIONS_JSON,
+    REACTIONS_CSV, REACTIONS_JSONL, PERSONALITIES_TXT, STREAM_FORMATS, CHECKPOINT_JOURNAL,
+    MAX_CONCURRENT_REQUESTS, METRICS_JSON, METRICS_PROM, ENABLE_PERSONALITY_REACTIONS
+)
+from instrumentation import Instrumentation
 from llm_client import LLMClient
 from context_analyzer import MatchContextAnalyzer
+from data_cache import load_table
 from prompt_builder import DynamicPromptBuilder
 from personality_reactor import PersonalityReactor
+from player_index import PlayerIndex
+from checkpoint import ReactionJournal, row_key, row_keys
+from engine_logging import get_logger, get_progress_logger, configure_logging, ProgressReporter
+from output_sinks import open_sinks, build_reactions_json
+
+logger = get_logger('engine')
+progress_logger = get_progress_logger()
 
 class ReactionEngine:
     """Main reaction generation engine with personality reactions"""
     
-    def __init__(self):
-        print("🚀 Initializing Enhanced Reaction Engine...")
-        
-        # Load data
-        self.df_big = pd.read_csv(BIGMATCHUPS_CSV)
-        self.df_season = pd.read_csv(SEASONSTATS_CSV)
-        self.df_player = pd.read_csv(PLAYERMATCH_CSV)
+    def __init__(self, df_big=None, df_season=None, df_player=None, llm=None):
+        """
+        Tables default to the CSVs in config; pass DataFrames to reuse
+        already-loaded data, and an LLMClient to pick its backend/cache
         
-        # Initialize components
-        self.llm = LLMClient()
-        self.context = MatchContextAnalyzer(self.df_big, self.df_season, self.df_player)
+        Construction is cheap: each CSV is read, and the LLM client and the
+        components built on the tables are created, the first time they are
+        used - so a lookup that only needs df_player never reads the others
+        or imports the provider SDK.
+        """
+        logger.info("🚀 Initializing Enhanced Reaction Engine...")
+        
+        # Data, loaded on first access (see the properties below)
+        self._df_big = df_big
+        self._df_season = df_season
+        self._df_player = df_player
+        
+        # Components, built on first access
+        self._llm = llm
+        self._context = None
+        self._personality_reactor = None
+        self._player_index = None
+        self._lazy_lock = threading.RLock()  # Components load the tables they need
         self.prompt_builder = DynamicPromptBuilder()
-        self.personality_reactor = PersonalityReactor(self.llm)
         
         self.reactions_data = []
+        self.keep_in_memory = True  # False = stream only, reactions_data stays empty
+        self.sinks = []
+        self.recorded_count = 0
+        self.personality_reaction_count = 0
+        
+        # Per-stage timings, shared with the LLM client (see instrumentation.py)
+        self.metrics = llm.metrics if llm is not None else Instrumentation()
         
-        print("✅ Engine ready with personality system!\n")
+        logger.info("✅ Engine ready with personality system!\n")
+    
+    def _load(self, attr, build):
+        """Return self.<attr>, building it once (thread-safe) if it is still None"""
+        value = getattr(self, attr)
+        if value is None:
+            with self._lazy_lock:
+                value = getattr(self, attr)
+                if value is None:
+                    value = build()
+                    setattr(self, attr, value)
+        return value
+    
+    @property
+    def df_big(self):
+        return self._load('_df_big', lambda: load_table(BIGMATCHUPS_CSV))
+    
+    @property
+    def df_season(self):
+        return self._load('_df_season', lambda: load_table(SEASONSTATS_CSV))
+    
+    @property
+    def df_player(self):
+        return self._load('_df_player', lambda: load_table(PLAYERMATCH_CSV))
     
-    def generate_single_reaction(self, row, output_format='all', include_personalities=True):
+    @property
+    def llm(self):
+        return self._load('_llm', lambda: LLMClient(metrics=self.metrics))
+    
+    @property
+    def context(self):
+        return self._load('_context', lambda: MatchContextAnalyzer(self.df_big, self.df_season, self.df_player))
+    
+    @property
+    def personality_reactor(self):
+        return self._load('_personality_reactor', lambda: PersonalityReactor(self.llm))
+    
+    @property
+    def player_index(self):
+        return self._load('_player_index', lambda: PlayerIndex(self.df_player, self.df_season))
+    
+    def _prepare_reaction(self, row, context_tags=None, row_label=''):
         """
-        Generate reactions for a single match/player
+        Run the CPU-side work for one row: context analysis and prompt building
         
-        Args:
-            row: DataFrame row with match data
-            output_format: 'all', 'commentator', 'journalist', 'fan_tweet', 'personalities'
-            include_personalities: Add pundit/manager/player reactions
+        context_tags may come precomputed from generate_context_tags_batch;
+        row_label (e.g. "[3/100] ") prefixes the row's log line
+        
+        Returns (reaction_entry, base_prompt, context_tags, context_narrative)
         """
         player_name = row.get('playername', 'Unknown Player')
         team = row.get('team', 'Unknown Team')
         opponent = row.get('opponent', 'Unknown Opponent')
         
-        print(f"⚡ Generating reaction: {player_name} ({team} vs {opponent})")
+        logger.info("%s⚡ Generating reaction: %s (%s vs %s)", row_label, player_name, team, opponent)
         
         # Get context
         team_stats = self.context.get_team_stats(team)
-        context_tags = self.context.generate_context_tags(row, team_stats)
-        context_narrative = self.context.build_narrative_string(context_tags)
+        if context_tags is None:
+            with self.metrics.span('context_tags'):
+                context_tags = self.context.generate_context_tags(row, team_stats)
+        with self.metrics.span('narrative'):
+            context_narrative = self.context.build_narrative_string(context_tags)
         
         # Build base prompt
-        base_prompt = self.prompt_builder.build_enriched_prompt(
-            row, team_stats, context_tags, context_narrative
-        )
+        with self.metrics.span('prompt_build'):
+            base_prompt = self.prompt_builder.build_enriched_prompt(
+                row, team_stats, context_tags, context_narrative
+            )
         
         reaction_entry = {
             'player': player_name,
@@ -67,36 +142,167 @@ class ReactionEngine:
             'context_tags': context_tags['performance_narratives']
         }
         
+        return reaction_entry, base_prompt, context_tags, context_narrative
+    
+    def _preview_personalities(self, personality_package):
+        """Log the first pundit's take as a progress preview"""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        first_pundit = list(personality_package['pundits'].keys())[0]
+        preview = personality_package['pundits'][first_pundit][:80]
+        logger.info("   💬 %s: %s...\n", first_pundit, preview)
+    
+    def generate_single_reaction(self, row, output_format='all', include_personalities=True,
+                                 context_tags=None, row_label=''):
+        """
+        Generate reactions for a single match/player
+        
+        Args:
+            row: DataFrame row with match data
+            output_format: 'all', 'commentator', 'journalist', 'fan_tweet', 'personalities'
+            include_personalities: Add pundit/manager/player reactions
+            context_tags: Precomputed tags for this row (computed here if None)
+            row_label: Prefix for the row's log line, e.g. "[3/100] "
+        """
+        reaction_entry, base_prompt, context_tags, context_narrative = self._prepare_reaction(
+            row, context_tags, row_label
+        )
+        
         # Generate standard tones
         if output_format == 'all' or output_format != 'personalities':
-            if output_format == 'all':
-                reactions = self.llm.generate_multi_tone_reactions(base_prompt, player_name)
-                reaction_entry.update(reactions)
-            else:
-                reaction = self.llm.generate_reaction(base_prompt)
-                reaction_entry[output_format] = reaction
+            with self.metrics.span('tones'):
+                if output_format == 'all':
+                    reactions = self.llm.generate_multi_tone_reactions(
+                        base_prompt, reaction_entry['player'], cache_scope=row_key(row)
+                    )
+                    reaction_entry.update(reactions)
+                else:
+                    reaction = self.llm.generate_reaction(base_prompt, cache_scope=row_key(row))
+                    reaction_entry[output_format] = reaction
         
         # Generate personality reactions
         if include_personalities and ENABLE_PERSONALITY_REACTIONS:
-            print(f"   🎭 Adding personality panel...")
+            logger.info("   🎭 Adding personality panel...")
             
-            personality_package = self.personality_reactor.generate_full_reaction_package(
-                row, context_tags, context_narrative
-            )
+            with self.metrics.span('personality_package'):
+                personality_package = self.personality_reactor.generate_full_reaction_package(
+                    row, context_tags, context_narrative
+                )
             
             reaction_entry['personality_reactions'] = personality_package
             
             # Preview one pundit
-            first_pundit = list(personality_package['pundits'].keys())[0]
-            preview = personality_package['pundits'][first_pundit][:80]
-            print(f"   💬 {first_pundit}: {preview}...\n")
+            self._preview_personalities(personality_package)
         
-        self.reactions_data.append(reaction_entry)
+        self._record(reaction_entry)
         
         return reaction_entry
     
+    async def agenerate_single_reaction(self, row, output_format='all', include_personalities=True,
+                                        context_tags=None):
+        """
+        Async variant of generate_single_reaction, for callers already inside
+        an event loop (e.g. reaction_service)
+        
+        Context and personality picks run on the loop thread; the tone and
+        personality LLM calls are awaited concurrently.
+        """
+        row_start = time.perf_counter()
+        reaction_entry, base_prompt, context_tags, context_narrative = self._prepare_reaction(row, context_tags)
+        
+        plan = None
+        if include_personalities and ENABLE_PERSONALITY_REACTIONS:
+            logger.info("   🎭 Adding personality panel...")
+            with self.metrics.span('personality_plan'):
+                plan = self.personality_reactor.plan_full_reaction_package(row, context_tags, context_narrative)
+        
+        reaction_entry = await self._agenerate_planned_reaction(
+            reaction_entry, base_prompt, output_format, plan, row_key(row)
+        )
+        self.metrics.observe('row', time.perf_counter() - row_start)
+        self._record(reaction_entry)
+        
+        return reaction_entry
+    
+    async def _agenerate_planned_reaction(self, reaction_entry, base_prompt, output_format, plan, scope=None):
+        """Run the LLM calls for a row whose context and selections are already made (scope: its row key)"""
+        calls = []
+        
+        if output_format == 'all':
+            calls.append(self._timed('tones', self.llm.agenerate_multi_tone_reactions(
+                base_prompt, reaction_entry['player'], cache_scope=scope
+            )))
+        elif output_format != 'personalities':
+            calls.append(self._timed('tones', self.llm.agenerate_reaction(base_prompt, cache_scope=scope)))
+        
+        if plan is not None:
+            calls.append(self._timed(
+                'personality_package', self.personality_reactor.agenerate_full_reaction_package(plan)
+            ))
+        
+        results = await asyncio.gather(*calls)
+        
+        if output_format == 'all':
+            reaction_entry.update(results.pop(0))
+        elif output_format != 'personalities':
+            reaction_entry[output_format] = results.pop(0)
+        
+        if plan is not None:
+            reaction_entry['personality_reactions'] = results.pop(0)
+            self._preview_personalities(reaction_entry['personality_reactions'])
+        
+        return reaction_entry
+    
+    async def _timed(self, stage, coro):
+        """Await coro as one span of stage (wall time, including waits on other rows)"""
+        with self.metrics.span(stage):
+            return await coro
+    
+    def _open_journal(self, checkpoint):
+        """Accept True (default journal path), a path, or an open ReactionJournal"""
+        if isinstance(checkpoint, ReactionJournal):
+            return checkpoint  # Even when still empty (len 0 is falsy)
+        if checkpoint is None or checkpoint is False:
+            return None
+        return ReactionJournal(CHECKPOINT_JOURNAL if checkpoint is True else checkpoint)
+    
+    def _close_journal(self, journal, checkpoint):
+        """Close journals we opened; just sync ones the caller owns"""
+        if journal is None:
+            return
+        if journal is checkpoint:
+            journal.sync()
+        else:
+            journal.close()
+    
+    def _iter_batch_rows(self, df, journal):
+        """
+        Yield (idx, row, key, context_tags, restored_entry) for every row of a batch
+        
+        Rows already in the journal come back with their stored entry and are
+        not re-tagged; the rest are tagged in one vectorized pass.
+        """
+        keys = row_keys(df) if journal is not None else [None] * len(df)
+        done = [journal is not None and key in journal for key in keys]
+        
+        if any(done):
+            progress_logger.info("♻️ Resuming: %d of %d rows already in %s\n", sum(done), len(df), journal.path)
+            todo = df[[not d for d in done]]
+        else:
+            todo = df
+        
+        # Tag every remaining row in one vectorized pass
+        with self.metrics.span('context_tags_batch'):
+            all_tags = iter(self.context.generate_context_tags_batch(todo).to_dict('records'))
+        
+        for idx, ((_, row), key, is_done) in enumerate(zip(df.iterrows(), keys, done), 1):
+            if is_done:
+                yield idx, row, key, None, journal.get(key)
+            else:
+                yield idx, row, key, next(all_tags), None
+    
     def process_batch(self, df=None, max_rows=None, output_format='all', 
-                     include_personalities=True, delay=0.5):
+                     include_personalities=True, delay=0, checkpoint=None):
         """
         Process multiple matches/players
         
@@ -105,8 +311,83 @@ class ReactionEngine:
             max_rows: Limit number of rows (for testing)
             output_format: Reaction format to generate
             include_personalities: Add personality reactions
-            delay: Delay between API calls (seconds)
+            delay: Extra pause between rows (seconds) - API pacing is handled
+                   by the LLMClient rate limiter, so this is normally 0
+            checkpoint: Journal path (True = CHECKPOINT_JOURNAL) or ReactionJournal.
+                        Finished rows are appended as they complete and rows
+                        already in the journal are skipped on re-runs.
+        """
+        if df is None:
+            df = self.df_player
+        
+        if max_rows:
+            df = df.head(max_rows)
+        
+        total = len(df)
+        progress_logger.info("🎯 Processing %d matches...\n", total)
+        
+        start_time = time.time()
+        journal = self._open_journal(checkpoint)
+        progress = ProgressReporter(total, lambda: self.llm.total_tokens)
+        
+        try:
+            for idx, row, key, context_tags, restored in self._iter_batch_rows(df, journal):
+                if restored is not None:
+                    self._record(restored)
+                    progress.update()
+                    continue
+                
+                try:
+                    with self.metrics.profile(idx), self.metrics.span('row'):
+                        reaction = self.generate_single_reaction(
+                            row, output_format, include_personalities, context_tags, f"[{idx}/{total}] "
+                        )
+                    
+                    if journal is not None:
+                        journal.append(key, reaction)
+                    
+                    if delay:
+                        time.sleep(delay)
+                
+                except Exception as e:
+                    logger.error("❌ Error processing row %d: %s\n", idx, e)
+                
+                progress.update()
+        finally:
+            self._close_journal(journal, checkpoint)
+        
+        progress.finish()
+        elapsed = time.time() - start_time
+        progress_logger.info("\n✅ Batch complete! Processed %d reactions in %.1fs", self.recorded_count, elapsed)
+        
+        return self.reactions_data
+    
+    def process_batch_async(self, df=None, max_rows=None, output_format='all',
+                            include_personalities=True, max_concurrency=MAX_CONCURRENT_REQUESTS,
+                            checkpoint=None):
+        """
+        Concurrent version of process_batch
+        
+        Rows and the per-row tone/personality calls run concurrently, with at
+        most max_concurrency LLM requests in flight. Results are appended to
+        reactions_data in input order, so save_outputs works unchanged.
+        
+        Args:
+            df: DataFrame to process (defaults to self.df_player)
+            max_rows: Limit number of rows (for testing)
+            output_format: Reaction format to generate
+            include_personalities: Add personality reactions
+            max_concurrency: Max in-flight LLM requests
+            checkpoint: Journal path / ReactionJournal, as in process_batch
         """
+        return asyncio.run(self.aprocess_batch(
+            df, max_rows, output_format, include_personalities, max_concurrency, checkpoint
+        ))
+    
+    async def aprocess_batch(self, df=None, max_rows=None, output_format='all',
+                             include_personalities=True, max_concurrency=MAX_CONCURRENT_REQUESTS,
+                             checkpoint=None):
+        """Coroutine behind process_batch_async, for callers already inside an event loop"""
         if df is None:
             df = self.df_player
         
@@ -114,168 +395,258 @@ class ReactionEngine:
             df = df.head(max_rows)
         
         total = len(df)
-        print(f"🎯 Processing {total} matches...\n")
+        progress_logger.info("🎯 Processing %d matches (%d requests in flight)...\n", total, max_concurrency)
         
+        self.llm.configure_concurrency(max_concurrency)
         start_time = time.time()
+        journal = self._open_journal(checkpoint)
+        progress = ProgressReporter(total, lambda: self.llm.total_tokens)
         
-        for idx, (_, row) in enumerate(df.iterrows(), 1):
+        pending = set()
+        finished = {}  # idx -> (reaction entry or None if the row failed, journal key)
+        next_idx = 1
+        
+        async def run_row(idx, key, row_start, *prepared):
             try:
-                print(f"[{idx}/{total}] ", end="")
-                reaction = self.generate_single_reaction(
-                    row, output_format, include_personalities
-                )
+                entry = await self._agenerate_planned_reaction(*prepared)
+                self.metrics.observe('row', time.perf_counter() - row_start)
+                return idx, entry, key
+            except Exception as e:
+                logger.error("❌ Error processing row %d: %s\n", idx, e)
+                return idx, None, None
+        
+        def collect(done):
+            nonlocal next_idx
+            for task in done:
+                idx, entry, key = task.result()
+                finished[idx] = (entry, key)
+            # Release in input order
+            while next_idx in finished:
+                entry, key = finished.pop(next_idx)
+                if entry is not None:
+                    self._record(entry)
+                    if journal is not None and key is not None:
+                        journal.append(key, entry)
+                next_idx += 1
+                progress.update()
+        
+        try:
+            for idx, row, key, context_tags, restored in self._iter_batch_rows(df, journal):
+                if restored is not None:
+                    finished[idx] = (restored, None)
+                    collect(())
+                    continue
                 
-                time.sleep(delay)  # Rate limiting
+                # Context, prompts and personality picks are made here, in input
+                # order, so only the LLM calls overlap
+                try:
+                    row_start = time.perf_counter()
+                    with self.metrics.profile(idx):
+                        reaction_entry, base_prompt, context_tags, context_narrative = self._prepare_reaction(
+                            row, context_tags, f"[{idx}/{total}] "
+                        )
+                        
+                        plan = None
+                        if include_personalities and ENABLE_PERSONALITY_REACTIONS:
+                            logger.info("   🎭 Adding personality panel...")
+                            with self.metrics.span('personality_plan'):
+                                plan = self.personality_reactor.plan_full_reaction_package(
+                                    row, context_tags, context_narrative
+                                )
+                except Exception as e:
+                    logger.error("❌ Error processing row %d: %s\n", idx, e)
+                    finished[idx] = (None, None)
+                    collect(())
+                    continue
                 
-            except Exception as e:
-                print(f"❌ Error processing row {idx}: {e}\n")
-                continue
+                pending.add(asyncio.create_task(
+                    run_row(idx, key, row_start, reaction_entry, base_prompt, output_format, plan,
+                            key if key is not None else row_key(row))
+                ))
+                
+                # Bound the number of rows in flight
+                if len(pending) >= max_concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    collect(done)
+            
+            if pending:
+                done, _ = await asyncio.wait(pending)
+                collect(done)
+        finally:
+            self._close_journal(journal, checkpoint)
         
+        progress.finish()
         elapsed = time.time() - start_time
-        print(f"\n✅ Batch complete! Processed {len(self.reactions_data)} reactions in {elapsed:.1f}s")
+        progress_logger.info("\n✅ Batch complete! Processed %d reactions in %.1fs", self.recorded_count, elapsed)
         
         return self.reactions_data
     
+    def _record(self, reaction_entry):
+        """Keep a finished reaction and hand it to any open streaming sinks"""
+        if self.keep_in_memory:
+            self.reactions_data.append(reaction_entry)
+        
+        for sink in self.sinks:
+            sink.write(reaction_entry)
+        
+        self.recorded_count += 1
+        self.llm.count_row()
+        if 'personality_reactions' in reaction_entry:
+            self.personality_reaction_count += len(reaction_entry['personality_reactions'].get('pundits', {})) + 2
+    
+    def stream_outputs(self, formats=STREAM_FORMATS, keep_in_memory=False, append=False):
+        """
+        Write every reaction to disk as soon as it is recorded
+        
+        Args:
+            formats: Any of 'jsonl', 'txt', 'personalities', 'csv'
+            keep_in_memory: Also accumulate reactions_data (off = flat memory)
+            append: Add to the existing output files (e.g. watch mode) instead of replacing them
+        """
+        self.sinks = open_sinks(self.output_paths(formats), append=append)
+        self.keep_in_memory = keep_in_memory
+        progress_logger.info("📡 Streaming outputs: %s", ', '.join(formats))
+    
+    @staticmethod
+    def output_paths(formats=STREAM_FORMATS):
+        """Configured output file for each requested streaming format"""
+        paths = {
+            'jsonl': REACTIONS_JSONL,
+            'txt': REACTIONS_TXT,
+            'personalities': PERSONALITIES_TXT,
+            'csv': REACTIONS_CSV
+        }
+        if not ENABLE_PERSONALITY_REACTIONS:
+            paths.pop('personalities')
+        
+        return {fmt: paths[fmt] for fmt in formats if fmt in paths}
+    
+    def close_outputs(self, build_json=True):
+        """Flush and close streaming sinks, then optionally build reactions.json from the JSONL stream"""
+        streamed_jsonl = any(sink.path == REACTIONS_JSONL for sink in self.sinks)
+        
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+        
+        if build_json and streamed_jsonl:
+            build_reactions_json(REACTIONS_JSONL, REACTIONS_JSON)
+        
+        self.print_stats()
+        self.export_metrics()
+    
     def save_outputs(self):
         """Save reactions to multiple formats"""
         
         # 1. JSON output (complete data)
+        os.makedirs(os.path.dirname(os.path.abspath(REACTIONS_JSON)), exist_ok=True)
         with open(REACTIONS_JSON, 'w', encoding='utf-8') as f:
             json.dump(self.reactions_data, f, indent=2, ensure_ascii=False)
-        print(f"📄 Saved JSON: {REACTIONS_JSON}")
-        
-        # 2. Standard text output
-        with open(REACTIONS_TXT, 'w', encoding='utf-8') as f:
-            for entry in self.reactions_data:
-                f.write(f"\n{'='*80}\n")
-                f.write(f"PLAYER: {entry['player']} ({entry['team']} vs {entry['opponent']})\n")
-                f.write(f"Stats: {entry['goals']} goals | {entry['rating']} rating | {entry['minutes']} mins\n")
-                f.write(f"{'='*80}\n\n")
-                
-                if 'commentator' in entry:
-                    f.write(f"🎙️ COMMENTATOR:\n{entry['commentator']}\n\n")
-                
-                if 'journalist' in entry:
-                    f.write(f"📰 JOURNALIST:\n{entry['journalist']}\n\n")
-                
-                if 'fan_tweet' in entry:
-                    f.write(f"💬 FAN TWEET:\n{entry['fan_tweet']}\n\n")
+        progress_logger.info("📄 Saved JSON: %s", REACTIONS_JSON)
         
-        print(f"📄 Saved TXT: {REACTIONS_TXT}")
+        # 2. Standard text, 3. personality reactions (separate file for
+        # readability) and 4. CSV (flat structure) share the streaming writers
+        paths = {'txt': REACTIONS_TXT, 'personalities': PERSONALITIES_TXT, 'csv': REACTIONS_CSV}
+        if not ENABLE_PERSONALITY_REACTIONS:
+            paths.pop('personalities')
         
-        # 3. Personality reactions (separate file for readability)
-        if ENABLE_PERSONALITY_REACTIONS:
-            with open(PERSONALITIES_TXT, 'w', encoding='utf-8') as f:
-                for entry in self.reactions_data:
-                    if 'personality_reactions' not in entry:
-                        continue
-                    
-                    f.write(f"\n{'#'*80}\n")
-                    f.write(f"MATCH: {entry['player']} - {entry['team']} vs {entry['opponent']}\n")
-                    f.write(f"Performance: {entry['goals']} goals, {entry['rating']} rating\n")
-                    f.write(f"{'#'*80}\n\n")
-                    
-                    pr = entry['personality_reactions']
-                    
-                    # Pundit panel
-                    f.write("🎙️ PUNDIT PANEL:\n")
-                    f.write("-" * 80 + "\n")
-                    for pundit, reaction in pr['pundits'].items():
-                        f.write(f"\n{pundit.upper()}:\n\"{reaction}\"\n")
-                    
-                    # Manager reaction
-                    if 'manager' in pr:
-                        f.write(f"\n{'='*80}\n")
-                        f.write(f"⚽ MANAGER'S VIEW ({pr['manager']['manager']}):\n")
-                        f.write(f"\"{pr['manager']['reaction']}\"\n")
-                    
-                    # Player reaction
-                    if 'player' in pr:
-                        f.write(f"\n{'='*80}\n")
-                        f.write(f"👤 PLAYER REACTION ({pr['player']['reactor']} - {pr['player']['relationship']}):\n")
-                        f.write(f"\"{pr['player']['reaction']}\"\n")
-                    
-                    f.write("\n\n")
-            
-            print(f"📄 Saved Personalities: {PERSONALITIES_TXT}")
-        
-        # 4. CSV export (flat structure, no nested personality data)
-        df_export = pd.DataFrame([
-            {
-                'player': e['player'],
-                'team': e['team'],
-                'opponent': e['opponent'],
-                'goals': e['goals'],
-                'rating': e['rating'],
-                'minutes': e['minutes'],
-                'commentator': e.get('commentator', ''),
-                'journalist': e.get('journalist', ''),
-                'fan_tweet': e.get('fan_tweet', '')
-            }
-            for e in self.reactions_data
-        ])
-        df_export.to_csv(REACTIONS_CSV, index=False, encoding='utf-8')
-        print(f"📄 Saved CSV: {REACTIONS_CSV}")
+        sinks = open_sinks(paths, buffer_size=max(len(self.reactions_data), 1))
+        for entry in self.reactions_data:
+            for sink in sinks:
+                sink.write(entry)
+        for sink in sinks:
+            sink.close()
         
         # 5. Print stats
+        self.print_stats()
+        self.export_metrics()
+    
+    def export_metrics(self, json_path=METRICS_JSON, prometheus_path=METRICS_PROM):
+        """Write the run's stage timings as JSON and Prometheus text"""
+        if not self.metrics.enabled or not self.metrics.histograms:
+            return
+        
+        self.metrics.export_json(json_path)
+        self.metrics.export_prometheus(prometheus_path)
+    
+    def print_stats(self):
+        """Log LLM usage for the run"""
         stats = self.llm.get_stats()
-        print(f"\n📊 LLM Usage Stats:")
-        print(f"   Total Requests: {stats['requests']}")
-        print(f"   Total Tokens: {stats['total_tokens']:,}")
-        print(f"   Avg Tokens/Request: {stats['avg_tokens_per_request']:.1f}")
+        progress_logger.info("\n📊 LLM Usage Stats:", extra={'fields': {'event': 'llm_stats', 'stats': stats}})
+        progress_logger.info("   Total Requests: %d", stats['requests'])
+        progress_logger.info("   Total Tokens: %s (%s prompt + %s completion)", f"{stats['total_tokens']:,}",
+                             f"{stats['prompt_tokens']:,}", f"{stats['completion_tokens']:,}")
+        progress_logger.info("   Avg Tokens/Request: %.1f", stats['avg_tokens_per_request'])
+        if stats['rows']:
+            progress_logger.info("   Per Row: %.1f tokens, %.2f requests", stats['tokens_per_row'], stats['requests_per_row'])
+        progress_logger.info("   Throughput: %.1f tokens/sec", stats['tokens_per_sec'])
+        progress_logger.info("   Request Latency: p50 %.0f ms | p95 %.0f ms | p99 %.0f ms", stats['latency_ms']['p50'],
+                             stats['latency_ms']['p95'], stats['latency_ms']['p99'])
+        if stats['rate_limit_retries'] or stats['fallbacks']:
+            progress_logger.info("   Retries: %d, Fallbacks: %d", stats['rate_limit_retries'], stats['fallbacks'])
+        
+        for mode, usage in stats['usage_by_mode'].items():
+            if usage['rows']:
+                progress_logger.info("   %s: %d requests, %.0f prompt tokens/row",
+                                     mode, usage['requests'], usage['prompt_tokens_per_row'])
         
         if ENABLE_PERSONALITY_REACTIONS:
-            total_personalities = sum(
-                len(e.get('personality_reactions', {}).get('pundits', {})) + 2
-                for e in self.reactions_data if 'personality_reactions' in e
-            )
-            print(f"   Personality Reactions: {total_personalities}")
+            progress_logger.info("   Personality Reactions: %d", self.personality_reaction_count)
+        
+        self.metrics.print_summary()
+    
+    def player_rows(self, player_name):
+        """df_player rows for a player query (see PlayerIndex.find_names)"""
+        return self.player_index.rows_for(player_name)
+    
+    def highlight_rows(self, min_rating=8.0):
+        """df_player rows rated min_rating or better"""
+        return self.df_player[self.df_player['rating'] >= min_rating]
+    
+    def rivalry_rows(self):
+        """df_player rows played between big-match rivals"""
+        return self.df_player[self.context.flag_big_matches(self.df_player)]
     
     def generate_for_player(self, player_name, include_personalities=True):
         """Generate reactions for specific player's matches"""
-        player_matches = self.df_player[
-            self.df_player['playername'].str.contains(player_name, case=False, na=False)
-        ]
+        player_matches = self.player_rows(player_name)
         
         if player_matches.empty:
-            print(f"❌ No matches found for player: {player_name}")
+            logger.warning("❌ No matches found for player: %s", player_name)
             return []
         
-        print(f"🎯 Found {len(player_matches)} matches for {player_name}")
+        progress_logger.info("🎯 Found %d matches for %s", len(player_matches), player_name)
         return self.process_batch(player_matches, include_personalities=include_personalities)
     
     def generate_highlight_reel(self, min_rating=8.0, include_personalities=True):
         """Generate reactions only for standout performances"""
-        highlights = self.df_player[self.df_player['rating'] >= min_rating]
+        highlights = self.highlight_rows(min_rating)
         
-        print(f"🌟 Generating reactions for {len(highlights)} standout performances (rating >= {min_rating})")
+        progress_logger.info("🌟 Generating reactions for %d standout performances (rating >= %s)",
+                             len(highlights), min_rating)
         return self.process_batch(highlights, include_personalities=include_personalities)
     
     def generate_rivalry_matches(self, include_personalities=True):
         """Generate reactions only for big rivalry matches"""
-        rivalry_matches = []
-        
-        for _, row in self.df_player.iterrows():
-            if self.context.is_big_match(row.get('teamid', 0), row.get('opponentid', 0)):
-                rivalry_matches.append(row)
+        df_rivalries = self.rivalry_rows()
         
-        if not rivalry_matches:
-            print("❌ No rivalry matches found")
+        if df_rivalries.empty:
+            logger.warning("❌ No rivalry matches found")
             return []
         
-        df_rivalries = pd.DataFrame(rivalry_matches)
-        print(f"⚔️ Generating reactions for {len(df_rivalries)} RIVALRY matches")
+        progress_logger.info("⚔️ Generating reactions for %d RIVALRY matches", len(df_rivalries))
         return self.process_batch(df_rivalries, include_personalities=include_personalities)
 
 
 def main():
     """Main execution"""
+    configure_logging()
     engine = ReactionEngine()
     
     # Choose your mode:
     
     # Mode 1: Process limited sample WITH personalities (RECOMMENDED for testing)
-    engine.process_batch(max_rows=3, output_format='all', include_personalities=True, delay=0.8)
+    engine.process_batch(max_rows=3, output_format='all', include_personalities=True)
     
     # Mode 2: Only rivalry matches with full personality panel
     # engine.generate_rivalry_matches(include_personalities=True)
@@ -287,7 +658,12 @@ def main():
     # engine.generate_for_player("Messi", include_personalities=True)
     
     # Mode 5: Full season WITHOUT personalities (faster, cheaper)
-    # engine.process_batch(max_rows=None, include_personalities=False, delay=0.5)
+    # engine.process_batch(max_rows=None, include_personalities=False)
+    
+    # Mode 6: Full season concurrently (rows + tone/personality calls in parallel)
+    # engine.process_batch_async(max_rows=None, include_personalities=True, max_concurrency=8)
+    
+    # Mode 7: Full career across worker processes - run sharded_runner.py instead
     
     # Save outputs
     engine.save_outputs()
@@ -0,0 +1,336 @@
+"""
+HTTP reaction service around one warm ReactionEngine.
+
+A small asyncio server (standard library only) for the match-day
+dashboard:
+
+    GET /reaction?row=12             one df_player row (or ?artificialkey=...)
+    GET /player?name=Messi           that player's matches
+    GET /highlights?min_rating=8.5   standout performances
+    GET /rivalry                     big-match rows
+    GET /health                      queue depth and usage stats
+
+Every endpoint also takes format (all, commentator, journalist, fan_tweet,
+personalities), personalities (1/0) and, for the multi-row ones, limit.
+Parameters can come in the query string or a JSON POST body.
+
+Rows go through a bounded queue drained by SERVICE_WORKERS tasks. A
+request that would overflow the queue gets 503 with Retry-After instead
+of piling up. Identical requests for the same row, format and personality
+setting that overlap share one in-flight generation. Try it offline with
+the mock backend:
+
+    LLM_BACKEND=mock python reaction_service.py
+"""
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, urlsplit
+from config import SERVICE_HOST, SERVICE_PORT, SERVICE_WORKERS, SERVICE_QUEUE_SIZE, SERVICE_MAX_ROWS
+from checkpoint import row_key
+from engine_logging import get_logger, get_progress_logger, configure_logging
+from reaction_engine import ReactionEngine
+
+logger = get_logger('service')
+progress_logger = get_progress_logger()
+
+OUTPUT_FORMATS = ('all', 'commentator', 'journalist', 'fan_tweet', 'personalities')
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable'
+}
+
+def _json_default(value):
+    if hasattr(value, 'item'):
+        return value.item()  # numpy scalar
+    return str(value)
+
+
+class ServiceError(Exception):
+    """Request failure that maps straight to an HTTP status"""
+    
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class ReactionService:
+    """
+    One ReactionEngine behind an HTTP front end
+    
+    The engine's context, prompt and personality work runs on the event
+    loop; its LLM calls go through the client's bounded thread pool.
+    """
+    
+    def __init__(self, engine=None, workers=SERVICE_WORKERS, queue_size=SERVICE_QUEUE_SIZE,
+                 max_rows=SERVICE_MAX_ROWS):
+        self.engine = engine if engine is not None else ReactionEngine()
+        self.engine.keep_in_memory = False  # Results go back to the caller, not into reactions_data
+        
+        self.num_workers = workers
+        self.queue_size = queue_size
+        self.max_rows = max_rows
+        
+        self.queue = None
+        self._workers = []
+        self.in_flight = {}  # (row key, format, personalities) -> Future shared by identical requests
+        self.stats = {'requests': 0, 'rows_generated': 0, 'coalesced': 0, 'rejected': 0, 'errors': 0}
+        
+        self.routes = {
+            '/health': self.health,
+            '/reaction': self.reaction,
+            '/player': self.player,
+            '/highlights': self.highlights,
+            '/rivalry': self.rivalry
+        }
+    
+    async def _worker(self):
+        while True:
+            row, output_format, include_personalities, future = await self.queue.get()
+            try:
+                entry = await self.engine.agenerate_single_reaction(row, output_format, include_personalities)
+                self.stats['rows_generated'] += 1
+                future.set_result(entry)
+            except Exception as e:
+                self.stats['errors'] += 1
+                future.set_exception(e)
+            finally:
+                self.queue.task_done()
+    
+    def _submit(self, rows, output_format, include_personalities):
+        """
+        Queue every row that is not already in flight
+        
+        All-or-nothing: if the new rows do not fit in the queue, nothing is
+        queued and the request is rejected.
+        
+        Returns:
+            list of futures, one per row
+        """
+        jobs = [(row, (row_key(row), output_format, include_personalities)) for row in rows]
+        new_keys = {key for _, key in jobs if key not in self.in_flight}
+        
+        if len(new_keys) > self.queue.maxsize - self.queue.qsize():
+            self.stats['rejected'] += 1
+            raise ServiceError(503, f"Queue full ({self.queue.qsize()}/{self.queue.maxsize} rows waiting)",
+                               {'Retry-After': '1'})
+        
+        loop = asyncio.get_running_loop()
+        futures = []
+        for row, key in jobs:
+            future = self.in_flight.get(key)
+            if future is None:
+                future = loop.create_future()
+                future.add_done_callback(lambda _, key=key: self.in_flight.pop(key, None))
+                self.in_flight[key] = future
+                self.queue.put_nowait((row, output_format, include_personalities, future))
+            else:
+                self.stats['coalesced'] += 1
+            futures.append(future)
+        return futures
+    
+    async def generate(self, df, params):
+        """Generate (or join in-flight generations of) every row of df, in order"""
+        output_format = params.get('format', 'all')
+        if output_format not in OUTPUT_FORMATS:
+            raise ServiceError(400, f"format must be one of {', '.join(OUTPUT_FORMATS)}")
+        include_personalities = _flag(params, 'personalities', True)
+        
+        futures = self._submit([row for _, row in df.iterrows()], output_format, include_personalities)
+        
+        # shield: a client hanging up must not cancel a generation other requests share
+        results = await asyncio.gather(*[asyncio.shield(f) for f in futures], return_exceptions=True)
+        
+        reactions = [r for r in results if not isinstance(r, BaseException)]
+        failed = len(results) - len(reactions)
+        if failed and not reactions:
+            raise ServiceError(500, f"Generation failed: {results[0]}")
+        return {'count': len(reactions), 'failed': failed, 'reactions': reactions}
+    
+    async def health(self, params):
+        return {
+            'status': 'ok',
+            'queue': self.queue.qsize(),
+            'queue_size': self.queue.maxsize,
+            'in_flight': len(self.in_flight),
+            'service': self.stats,
+            'llm': self.engine.llm.get_stats()
+        }
+    
+    async def reaction(self, params):
+        df = self.engine.df_player
+        if 'artificialkey' in params and 'artificialkey' in df:
+            rows = df[df['artificialkey'] == _int(params, 'artificialkey')]
+        elif 'row' in params:
+            position = _int(params, 'row')
+            if not 0 <= position < len(df):
+                raise ServiceError(404, f"row must be 0-{len(df) - 1}")
+            rows = df.iloc[[position]]
+        else:
+            raise ServiceError(400, "Pass row=<position> or artificialkey=<key>")
+        
+        if rows.empty:
+            raise ServiceError(404, "No such match row")
+        
+        result = await self.generate(rows.head(1), params)
+        return {'reaction': result['reactions'][0]}
+    
+    async def player(self, params):
+        name = _str(params, 'name', '').strip()
+        if not name:
+            raise ServiceError(400, "Pass name=<player>")
+        
+        rows = self.engine.player_rows(name)
+        if rows.empty:
+            raise ServiceError(404, f"No matches found for player: {name}")
+        return await self.generate(self._limit(rows, params), params)
+    
+    async def highlights(self, params):
+        rows = self.engine.highlight_rows(_float(params, 'min_rating', 8.0))
+        return await self.generate(self._limit(rows, params), params)
+    
+    async def rivalry(self, params):
+        rows = self.engine.rivalry_rows()
+        return await self.generate(self._limit(rows, params), params)
+    
+    def _limit(self, rows, params):
+        limit = _int(params, 'limit', self.max_rows)
+        if limit < 1:
+            raise ServiceError(400, "limit must be at least 1")  # head(-N) would return all but N rows
+        return rows.head(min(limit, self.max_rows))
+    
+    async def dispatch(self, method, path, params):
+        """Returns (status, payload, extra headers)"""
+        handler = self.routes.get(path.rstrip('/') or '/')
+        if handler is None:
+            return 404, {'error': f"Unknown endpoint: {path}"}, {}
+        if method not in ('GET', 'POST'):
+            return 405, {'error': "Use GET or POST"}, {}
+        
+        self.stats['requests'] += 1
+        try:
+            return 200, await handler(params), {}
+        except ServiceError as e:
+            return e.status, {'error': str(e)}, e.headers
+        except Exception as e:
+            logger.error("❌ %s failed: %s", path, e)
+            return 500, {'error': str(e)}, {}
+    
+    async def handle_connection(self, reader, writer):
+        """One request per connection: parse, dispatch, reply, close"""
+        start = time.perf_counter()
+        method = path = '-'
+        try:
+            request_line = (await reader.readline()).decode('latin-1')
+            method, target, _ = request_line.split(' ', 2)
+            
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            
+            url = urlsplit(target)
+            path = url.path
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            
+            length = int(headers.get('content-length') or 0)
+            if length:
+                body = json.loads(await reader.readexactly(length))
+                if not isinstance(body, dict):
+                    raise ValueError("JSON body must be an object")
+                params.update(body)
+            
+            status, payload, extra_headers = await self.dispatch(method, path, params)
+        except (ValueError, UnicodeDecodeError, asyncio.IncompleteReadError) as e:
+            status, payload, extra_headers = 400, {'error': f"Bad request: {e}"}, {}
+        
+        body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+        head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+                "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(body)}",
+                "Connection: close"]
+        head += [f"{name}: {value}" for name, value in extra_headers.items()]
+        
+        try:
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+            await writer.drain()
+        except ConnectionError:
+            pass  # Client went away; shared generations carry on
+        finally:
+            writer.close()
+        
+        logger.info("🌐 %s %s -> %d (%.0f ms)", method, path, status, (time.perf_counter() - start) * 1000)
+    
+    async def start(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        """Start the workers and the listener; returns the asyncio server"""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.engine.llm.configure_concurrency(self.engine.llm.max_in_flight)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.num_workers)]
+        
+        # Warm the tables and indexes now rather than on the first request
+        self.engine.player_index
+        self.engine.context
+        
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        progress_logger.info("🌐 Reaction service on http://%s:%d (%d workers, queue %d)",
+                             host, server.sockets[0].getsockname()[1], self.num_workers, self.queue_size)
+        return server
+    
+    async def serve(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        """Run until cancelled"""
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for worker in self._workers:
+                worker.cancel()
+
+
+def _str(params, name, default=None):
+    value = params.get(name, default)
+    if not isinstance(value, str):
+        raise ServiceError(400, f"{name} must be a string")
+    return value
+
+def _int(params, name, default=None):
+    value = params.get(name, default)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ServiceError(400, f"{name} must be an integer")
+
+def _float(params, name, default=None):
+    value = params.get(name, default)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ServiceError(400, f"{name} must be a number")
+
+def _flag(params, name, default):
+    value = params.get(name, default)
+    if isinstance(value, str):
+        return value.strip().lower() not in ('0', 'false', 'no', 'off', '')
+    return bool(value)
+
+
+def main():
+    """Serve on SERVICE_HOST:SERVICE_PORT until Ctrl+C"""
+    configure_logging()
+    try:
+        asyncio.run(ReactionService().serve())
+    except KeyboardInterrupt:
+        progress_logger.info("\n🛑 Reaction service stopped")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
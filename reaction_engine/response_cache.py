@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from config import RESPONSE_CACHE_DB, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_AGE_DAYS
+
+class ResponseCache:
+    """
+    Persistent, content-addressed cache of LLM responses (SQLite)
+    
+    Entries are keyed by a hash of everything that shapes a completion -
+    model, system message, prompt and sampling params - plus the row the
+    response was generated for, so re-running a batch costs no API calls
+    while two rows that happen to build the same prompt still get their
+    own reactions.
+    """
+    
+    EVICT_EVERY = 200  # Puts between eviction sweeps
+    
+    def __init__(self, path=RESPONSE_CACHE_DB, max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+                 max_age_days=RESPONSE_CACHE_MAX_AGE_DAYS):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self._puts = 0
+        
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        
+        # One connection shared by the batch worker threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                tokens INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON responses(last_used)")
+        self.evict()
+    
+    @staticmethod
+    def make_key(model, system_message, prompt, temperature, max_tokens, top_p, response_format=None,
+                 scope=None):
+        """Stable hash of a request's content and sampling params (and scope, e.g. a row key)"""
+        request = {
+            'model': model,
+            'system': system_message,
+            'prompt': prompt,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'top_p': top_p
+        }
+        if response_format is not None:
+            request['response_format'] = response_format
+        if scope is not None:
+            request['scope'] = scope
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        """Return the cached response text, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created, tokens FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None or (self.max_age and now - row[1] > self.max_age):
+                self.misses += 1
+                return None
+            
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            self.tokens_saved += row[2]
+            return row[0]
+    
+    def put(self, key, response, tokens=0):
+        """Store a response"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, tokens, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, tokens, now, now)
+            )
+            self._puts += 1
+            sweep = self._puts % self.EVICT_EVERY == 0
+        
+        if sweep:
+            self.evict()
+    
+    def evict(self):
+        """Drop expired entries, then the least recently used beyond max_entries"""
+        with self._lock:
+            if self.max_age:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE created < ?", (time.time() - self.max_age,)
+                )
+            if self.max_entries:
+                self._conn.execute("""
+                    DELETE FROM responses WHERE key IN (
+                        SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,))
+    
+    def stats(self):
+        """Hit/miss counters plus current size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        
+        lookups = self.hits + self.misses
+        return {
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_hit_rate': self.hits / lookups if lookups else 0.0,
+            'cache_tokens_saved': self.tokens_saved,
+            'cache_entries': entries
+        }
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
\ No newline at end of file
@@ -0,0 +1,301 @@
+"""
+Multiprocess batch runner for full-career regeneration.
+
+df_player is split into shards (by team, by date range or in plain row
+blocks) and each shard runs in its own worker process with its own
+ReactionEngine, LLMClient and PersonalityReactor, so context building and
+prompt formatting no longer share one GIL with the network waits. Every
+shard journals its finished rows; the journals are merged back into input
+order and written through the usual output sinks.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from config import (
+    SHARD_WORKERS, SHARD_BY, SHARD_DIR, PLAYERMATCH_CSV, STREAM_FORMATS,
+    REACTIONS_JSONL, REACTIONS_JSON, RATE_LIMIT_RPM, RATE_LIMIT_TPM,
+    MAX_CONCURRENT_REQUESTS, PERSONALITY_VARIETY_WINDOW
+)
+from checkpoint import ReactionJournal, row_keys
+from data_cache import load_table
+from engine_logging import get_progress_logger, configure_logging, logging_settings, apply_logging_settings
+from output_sinks import open_sinks, build_reactions_json
+from rate_limiter import RateLimiter
+from reaction_engine import ReactionEngine
+from usage import merge_snapshots, usage_report
+
+logger = get_progress_logger()
+
+def shard_positions(df, num_shards, shard_by=SHARD_BY):
+    """
+    Split df into at most num_shards groups of row positions
+    
+    Args:
+        shard_by: 'team' (whole teams, balanced by row count), 'date'
+                  (contiguous date ranges) or 'rows' (contiguous blocks)
+    
+    Returns:
+        list of (label, positions) with positions ascending
+    """
+    num_shards = max(1, min(num_shards, len(df)))
+    shards = []
+    
+    if shard_by == 'team' and 'team' in df:
+        # Biggest teams first, each onto the least loaded shard
+        groups = df.groupby('team', sort=False, dropna=False, observed=True).indices
+        bins = [[] for _ in range(num_shards)]
+        teams = [[] for _ in range(num_shards)]
+        loads = [0] * num_shards
+        for team, positions in sorted(groups.items(), key=lambda kv: (-len(kv[1]), str(kv[0]))):
+            i = loads.index(min(loads))
+            bins[i].append(positions)
+            teams[i].append(str(team))
+            loads[i] += len(positions)
+        
+        for names, parts in zip(teams, bins):
+            if parts:
+                label = ', '.join(names[:3]) + (f" +{len(names) - 3} teams" if len(names) > 3 else '')
+                shards.append((label, np.sort(np.concatenate(parts))))
+    
+    elif shard_by == 'date' and 'date' in df:
+        # Export dates are yyyymmdd, so raw values already sort chronologically
+        dates = df['date'].reset_index(drop=True)
+        order = dates.sort_values(kind='stable').index.to_numpy()  # Missing dates sort last
+        for chunk in np.array_split(order, num_shards):
+            if len(chunk):
+                span = dates.iloc[chunk].dropna()
+                label = f"{span.min()} → {span.max()}" if len(span) else "undated"
+                shards.append((label, np.sort(chunk)))
+    
+    else:
+        for chunk in np.array_split(np.arange(len(df)), num_shards):
+            if len(chunk):
+                shards.append((f"rows {chunk[0] + 1}-{chunk[-1] + 1}", chunk))
+    
+    return shards
+
+def _run_shard(shard_id, label, shard_df, journal_path, options):
+    """Worker process: run one shard through its own engine, journaling every finished row"""
+    apply_logging_settings(options['logging'])  # Spawned workers start unconfigured
+    
+    engine = ReactionEngine(**options['tables'])
+    engine.keep_in_memory = False  # Rows go to the journal; the parent merges them
+    
+    # The process-wide budget is split evenly between the shards
+    rpm, tpm = options['rate_limits']
+    engine.llm.rate_limiter = RateLimiter(rpm, tpm)
+    
+    engine.personality_reactor.used_personalities = list(options['used_personalities'])
+    
+    start_time = time.time()
+    if options['use_async']:
+        engine.process_batch_async(
+            shard_df, output_format=options['output_format'],
+            include_personalities=options['include_personalities'],
+            max_concurrency=options['max_concurrency'], checkpoint=journal_path
+        )
+    else:
+        engine.process_batch(
+            shard_df, output_format=options['output_format'],
+            include_personalities=options['include_personalities'], checkpoint=journal_path
+        )
+    elapsed = time.time() - start_time
+    
+    llm_stats = engine.llm.get_stats()
+    return {
+        'shard': shard_id,
+        'label': label,
+        'rows': len(shard_df),
+        'reactions': engine.recorded_count,
+        'elapsed': elapsed,
+        'rows_per_sec': len(shard_df) / elapsed if elapsed else 0.0,
+        'requests': llm_stats['requests'],
+        'tokens': llm_stats['total_tokens'],
+        'usage': engine.llm.usage.snapshot()  # Merged with the other shards' in the parent
+    }
+
+
+class ShardedRunner:
+    """
+    Run a batch across worker processes and merge the results in input order
+    
+    Variety state: every shard starts from the same used_personalities
+    window (the caller's, or empty) and keeps its own window for its rows,
+    so repetition is only avoided within a shard. After the merge, the run's
+    window is the last PERSONALITY_VARIETY_WINDOW pundits of the merged
+    output - what a sequential run over the same rows would end with - and
+    can seed the next run.
+    """
+    
+    def __init__(self, num_shards=SHARD_WORKERS, shard_by=SHARD_BY, shard_dir=SHARD_DIR,
+                 df_big=None, df_season=None, df_player=None,
+                 requests_per_minute=RATE_LIMIT_RPM, tokens_per_minute=RATE_LIMIT_TPM):
+        self.num_shards = num_shards
+        self.shard_by = shard_by
+        self.shard_dir = shard_dir
+        
+        # Process-wide API budget, split evenly between the shards
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        
+        # Tables handed to every worker's ReactionEngine (None = each worker reads the CSVs)
+        self.tables = {'df_big': df_big, 'df_season': df_season, 'df_player': df_player}
+        
+        self.shard_stats = []
+        self.usage = usage_report(merge_snapshots([]))
+        self.used_personalities = []
+    
+    def run(self, df=None, max_rows=None, output_format='all', include_personalities=True,
+            use_async=False, max_concurrency=MAX_CONCURRENT_REQUESTS, formats=STREAM_FORMATS,
+            resume=False, used_personalities=None):
+        """
+        Process df across the worker pool and write the merged outputs
+        
+        Args:
+            df: DataFrame to process (defaults to the full player match table)
+            max_rows: Limit number of rows (for testing)
+            use_async: Run each shard with process_batch_async
+            max_concurrency: In-flight LLM requests per shard when use_async
+            formats: Output formats to write, as in ReactionEngine.stream_outputs
+            resume: Keep existing shard journals and skip rows already done
+            used_personalities: Variety window every shard starts from
+        
+        Returns:
+            dict: reactions written, elapsed seconds, per-shard stats, merged LLM usage
+                  (see usage.usage_report) and the merged variety window
+        """
+        if df is None:
+            df = self.tables['df_player']
+        if df is None:
+            df = load_table(PLAYERMATCH_CSV)
+        
+        if max_rows:
+            df = df.head(max_rows)
+        
+        shards = shard_positions(df, self.num_shards, self.shard_by)
+        logger.info("🧩 Processing %d matches in %d shards (by %s)...\n", len(df), len(shards), self.shard_by)
+        
+        os.makedirs(self.shard_dir, exist_ok=True)
+        journal_paths = [os.path.join(self.shard_dir, f"shard_{i}.jsonl") for i in range(len(shards))]
+        if not resume:
+            for path in journal_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+        
+        share = len(shards)
+        options = {
+            'tables': self.tables,
+            'rate_limits': (self.rpm / share if self.rpm else None,
+                            self.tpm / share if self.tpm else None),
+            'used_personalities': list(used_personalities or []),
+            'use_async': use_async,
+            'max_concurrency': max_concurrency,
+            'output_format': output_format,
+            'include_personalities': include_personalities,
+            'logging': logging_settings()
+        }
+        
+        start_time = time.time()
+        self.shard_stats = []
+        usage_snapshots = []
+        
+        with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+            futures = [
+                pool.submit(_run_shard, i, label, df.iloc[positions], journal_paths[i], options)
+                for i, (label, positions) in enumerate(shards)
+            ]
+            for future in as_completed(futures):
+                stats = future.result()
+                usage_snapshots.append(stats.pop('usage'))
+                self.shard_stats.append(stats)
+                logger.info("✅ Shard %d done: %d/%d rows in %.1fs",
+                            stats['shard'], stats['reactions'], stats['rows'], stats['elapsed'],
+                            extra={'fields': dict(stats, event='shard_done')})
+        
+        self.shard_stats.sort(key=lambda stats: stats['shard'])
+        self.usage = usage_report(merge_snapshots(usage_snapshots))
+        written = self.merge(df, journal_paths, formats)
+        elapsed = time.time() - start_time
+        
+        self.print_report(len(df), elapsed)
+        
+        return {
+            'reactions': written,
+            'elapsed': elapsed,
+            'shards': self.shard_stats,
+            'usage': self.usage,
+            'used_personalities': self.used_personalities
+        }
+    
+    def merge(self, df, journal_paths, formats=STREAM_FORMATS):
+        """Write every shard's journaled reactions in df's row order; returns the count written"""
+        # Entries are read back one at a time, so merging holds only the keys
+        journals = [ReactionJournal(path) for path in journal_paths]
+        owners = {}
+        for journal in journals:
+            owners.update(dict.fromkeys(journal.offsets, journal))
+        
+        sinks = open_sinks(ReactionEngine.output_paths(formats))
+        written = 0
+        window = []
+        
+        for key in row_keys(df):
+            journal = owners.get(key)
+            if journal is None:
+                continue  # Row failed in its shard
+            entry = journal.get(key)
+            
+            for sink in sinks:
+                sink.write(entry)
+            written += 1
+            
+            pundits = entry.get('personality_reactions', {}).get('pundits', {})
+            if pundits:
+                window = (window + list(pundits))[-PERSONALITY_VARIETY_WINDOW:]
+        
+        for sink in sinks:
+            sink.close()
+        for journal in journals:
+            journal.close()
+        
+        if any(sink.path == REACTIONS_JSONL for sink in sinks):
+            build_reactions_json(REACTIONS_JSONL, REACTIONS_JSON)
+        
+        self.used_personalities = window
+        return written
+    
+    def print_report(self, total_rows, elapsed):
+        """Per-shard throughput and the overall rate"""
+        logger.info("\n📊 Shard Throughput:")
+        for stats in self.shard_stats:
+            logger.info("   [%d] %s: %d rows, %.1fs, %.2f rows/sec, %d requests, %s tokens",
+                        stats['shard'], stats['label'], stats['rows'], stats['elapsed'],
+                        stats['rows_per_sec'], stats['requests'], f"{stats['tokens']:,}")
+        
+        rate = total_rows / elapsed if elapsed else 0.0
+        tokens = sum(stats['tokens'] for stats in self.shard_stats)
+        logger.info("   Total: %d rows in %.1fs (%.2f rows/sec), %s tokens", total_rows, elapsed, rate, f"{tokens:,}",
+                    extra={'fields': {'event': 'sharded_run', 'rows': total_rows, 'elapsed': elapsed,
+                                      'rows_per_sec': rate, 'tokens': tokens, 'usage': self.usage}})
+        
+        usage = self.usage
+        logger.info("   Tokens: %s prompt + %s completion | %.1f tokens/row | %.1f tokens/sec",
+                    f"{usage['prompt_tokens']:,}", f"{usage['completion_tokens']:,}",
+                    usage['tokens_per_row'], usage['tokens_per_sec'])
+        logger.info("   Request Latency: p50 %.0f ms | p95 %.0f ms | p99 %.0f ms | %d retries, %d fallbacks",
+                    usage['latency_ms']['p50'], usage['latency_ms']['p95'], usage['latency_ms']['p99'],
+                    usage['rate_limit_retries'], usage['fallbacks'])
+
+
+def main():
+    """Full-career regeneration across SHARD_WORKERS processes"""
+    configure_logging()
+    runner = ShardedRunner()
+    runner.run(max_rows=None, include_personalities=True)
+    
+    print("\n🎉 Sharded run complete!")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
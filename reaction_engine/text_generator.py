@@ -1,6 +1,8 @@
+from llm_backends import MockBackend
+
 def generate_text(prompt):
     """
     Mock function simulating LLM output.
-    Replace with GPT call later if needed.
+    For full offline runs use LLMClient(backend=MockBackend()) or LLM_BACKEND=mock.
     """
-    return f"[Mock Reaction] {prompt[:80]}..."
+    return MockBackend.render(prompt)
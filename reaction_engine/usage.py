@@ -0,0 +1,201 @@
+"""
+LLM usage accounting that stays exact under threads, asyncio and worker processes.
+
+Every thread records into its own counters (the event loop thread serves
+all of its tasks), so recording never takes a lock and never loses an
+update. Readers sum every thread's counters; when a thread exits, its
+counters are folded into one retired total, so executors being rebuilt
+and pools coming and going do not grow the set of shards. snapshot() is a plain dict
+that can be pickled back from a worker process and combined with
+merge_snapshots(); usage_report() turns a snapshot into the numbers we
+print: prompt/completion tokens, per-mode, per-tone and per-personality
+call counts, retries, fallbacks, request latency percentiles, cost per
+row and tokens per second.
+"""
+import threading
+import time
+import weakref
+from instrumentation import Histogram
+
+class _ThreadToken:
+    """Lives in one thread's local storage, so it is collected when that thread exits"""
+    __slots__ = ('__weakref__',)
+
+
+def _new_shard():
+    return {'counters': {}, 'latency': Histogram(), 'first': None, 'last': None}
+
+class UsageStats:
+    """Per-thread usage counters, merged when read"""
+    
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _new_shard()  # Counters of threads that have exited
+        self._registry_lock = threading.Lock()  # Only taken when a thread starts or stops recording
+    
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = _new_shard()
+            with self._registry_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            self._local.token = token = _ThreadToken()
+            weakref.finalize(token, self._retire, shard)
+        return shard
+    
+    def _retire(self, shard):
+        """Fold an exited thread's counters into the retired total"""
+        with self._registry_lock:
+            self._shards = [s for s in self._shards if s is not shard]
+            retired = self._retired
+            for key, value in shard['counters'].items():
+                retired['counters'][key] = retired['counters'].get(key, 0) + value
+            retired['latency'].merge(shard['latency'])
+            if shard['first'] is not None:
+                retired['first'] = shard['first'] if retired['first'] is None else min(retired['first'], shard['first'])
+                retired['last'] = shard['last'] if retired['last'] is None else max(retired['last'], shard['last'])
+    
+    def add(self, key, amount=1):
+        counters = self._shard()['counters']
+        counters[key] = counters.get(key, 0) + amount
+    
+    def record_request(self, mode, usage, seconds, label=None):
+        """
+        Count one completed API request
+        
+        Args:
+            mode: Generation mode (single, tones_split, panel_combined, ...)
+            usage: Token usage (prompt_tokens, completion_tokens, total_tokens)
+            seconds: Provider call latency
+            label: Tone or personality the call was for, if any ('tone/...' or 'personality/...')
+        """
+        shard = self._shard()
+        counters = shard['counters']
+        for key, amount in (
+            ('requests', 1),
+            ('prompt_tokens', usage.prompt_tokens),
+            ('completion_tokens', usage.completion_tokens),
+            ('total_tokens', usage.total_tokens),
+            (f'mode/{mode}/requests', 1),
+            (f'mode/{mode}/prompt_tokens', usage.prompt_tokens),
+            (f'mode/{mode}/completion_tokens', usage.completion_tokens)
+        ):
+            counters[key] = counters.get(key, 0) + amount
+        if label:
+            counters[label] = counters.get(label, 0) + 1
+        
+        shard['latency'].observe(seconds)
+        now = time.time()
+        if shard['first'] is None:
+            shard['first'] = now - seconds
+        shard['last'] = now
+    
+    def total(self, key):
+        """One counter summed across threads (cheap enough for progress lines)"""
+        with self._registry_lock:
+            shards = list(self._shards)
+            retired = self._retired['counters'].get(key, 0)
+        return retired + sum(shard['counters'].get(key, 0) for shard in shards)
+    
+    def snapshot(self):
+        """Every thread's counters merged into one picklable dict"""
+        with self._registry_lock:
+            shards = list(self._shards)
+            retired = _shard_state(self._retired)
+        
+        return merge_snapshots([retired] + [_shard_state(shard) for shard in shards])
+    
+    def report(self):
+        return usage_report(self.snapshot())
+
+
+def _shard_state(shard):
+    # dict() copies under the GIL, so a thread recording meanwhile cannot break the copy
+    return {
+        'counters': dict(shard['counters']),
+        'latency': _histogram_state(shard['latency']),
+        'first': shard['first'],
+        'last': shard['last']
+    }
+
+def _histogram_state(histogram):
+    return {'counts': list(histogram.counts), 'count': histogram.count,
+            'total': histogram.total, 'max': histogram.max}
+
+def _histogram(state):
+    histogram = Histogram()
+    histogram.counts = list(state['counts'])
+    histogram.count = state['count']
+    histogram.total = state['total']
+    histogram.max = state['max']
+    return histogram
+
+def merge_snapshots(snapshots):
+    """Combine snapshots from several threads, clients or worker processes"""
+    counters = {}
+    latency = Histogram()
+    first = last = None
+    
+    for snapshot in snapshots:
+        for key, value in snapshot['counters'].items():
+            counters[key] = counters.get(key, 0) + value
+        latency.merge(_histogram(snapshot['latency']))
+        if snapshot['first'] is not None:
+            first = snapshot['first'] if first is None else min(first, snapshot['first'])
+            last = snapshot['last'] if last is None else max(last, snapshot['last'])
+    
+    return {'counters': counters, 'latency': _histogram_state(latency), 'first': first, 'last': last}
+
+def usage_report(snapshot):
+    """Totals, per-row cost, throughput, latency and breakdowns from a snapshot"""
+    counters = snapshot['counters']
+    requests = counters.get('requests', 0)
+    rows = counters.get('rows', 0)
+    total_tokens = counters.get('total_tokens', 0)
+    
+    span = (snapshot['last'] - snapshot['first']) if snapshot['first'] is not None else 0.0
+    latency = _histogram(snapshot['latency'])
+    
+    usage_by_mode = {}
+    calls_by_tone = {}
+    calls_by_personality = {}
+    for key, value in counters.items():
+        kind, _, rest = key.partition('/')
+        if kind == 'mode':
+            mode, _, field = rest.rpartition('/')
+            usage_by_mode.setdefault(mode, {
+                'requests': 0, 'rows': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'unusable': 0
+            })[field] = value
+        elif kind == 'tone':
+            calls_by_tone[rest] = value
+        elif kind == 'personality':
+            calls_by_personality[rest] = value
+    
+    for usage in usage_by_mode.values():
+        usage['prompt_tokens_per_row'] = usage['prompt_tokens'] / max(usage['rows'], 1)
+    
+    return {
+        'requests': requests,
+        'prompt_tokens': counters.get('prompt_tokens', 0),
+        'completion_tokens': counters.get('completion_tokens', 0),
+        'total_tokens': total_tokens,
+        'avg_tokens_per_request': total_tokens / max(requests, 1),
+        'rows': rows,
+        'tokens_per_row': total_tokens / rows if rows else 0.0,
+        'requests_per_row': requests / rows if rows else 0.0,
+        'tokens_per_sec': total_tokens / span if span else 0.0,
+        'rate_limit_retries': counters.get('retries', 0),
+        'fallbacks': counters.get('fallbacks', 0),
+        'latency_ms': {
+            'mean': latency.total / latency.count * 1000 if latency.count else 0.0,
+            'p50': latency.quantile(0.50) * 1000,
+            'p95': latency.quantile(0.95) * 1000,
+            'p99': latency.quantile(0.99) * 1000,
+            'max': latency.max * 1000
+        },
+        'usage_by_mode': usage_by_mode,
+        'calls_by_tone': calls_by_tone,
+        'calls_by_personality': calls_by_personality
+    }